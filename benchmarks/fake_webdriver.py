@@ -0,0 +1,216 @@
+"""
+保存済みHTMLを読み込んで Selenium の WebDriver / WebElement のふりをするベンチマーク用ドライバ。
+XPath は lxml で評価し、スクリプト本体が使う execute_script は同じ結果をPythonで返す。
+WebDriverへの問い合わせ（find_element(s) / get_attribute / text / execute_script / get など）は
+すべて round_trips に数える。実ブラウザとの通信1回に相当する。
+"""
+
+import re
+
+from lxml import etree, html as lxml_html
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.common.by import By
+
+import scrape_and_save_tweets as sst
+
+BASE_URL = "https://x.com"
+
+
+def absolute_url(value):
+    return f"{BASE_URL}{value}" if value and value.startswith("/") else value
+
+
+def css_to_xpath(selector):
+    """スクリプト内で使われる「[data-testid='x'], ...」形式のCSSセレクタのみ対応"""
+    parts = []
+    for part in selector.split(","):
+        m = re.fullmatch(r"\s*\[([\w-]+)='([^']*)'\]\s*", part)
+        if not m:
+            raise ValueError(f"未対応のCSSセレクタ: {selector}")
+        parts.append(f"//*[@{m.group(1)}='{m.group(2)}']")
+    return " | ".join(parts)
+
+
+def inner_text(node):
+    return "".join(node.itertext()).strip()
+
+
+class FakeElement:
+    def __init__(self, driver, node):
+        self._driver = driver
+        self._node = node
+
+    def __eq__(self, other):
+        return isinstance(other, FakeElement) and self._node is other._node
+
+    def __hash__(self):
+        return id(self._node)
+
+    @property
+    def parent(self):
+        return self._driver
+
+    @property
+    def text(self):
+        self._driver.round_trips += 1
+        return inner_text(self._node)
+
+    @property
+    def tag_name(self):
+        self._driver.round_trips += 1
+        return self._node.tag
+
+    def get_attribute(self, name):
+        self._driver.round_trips += 1
+        if name == "outerHTML":
+            return etree.tostring(self._node, encoding="unicode", method="html")
+        value = self._node.get(name)
+        return absolute_url(value) if name in ("href", "src") else value
+
+    def is_enabled(self):
+        self._driver.round_trips += 1
+        return True
+
+    def find_element(self, by=By.XPATH, value=None):
+        return self._driver._find(self._node, by, value, single=True)
+
+    def find_elements(self, by=By.XPATH, value=None):
+        return self._driver._find(self._node, by, value, single=False)
+
+
+class FakeDriver:
+    """
+    pages: URL → HTML文字列。URLの一致がなければ route(url) でHTMLを選ぶ
+    """
+
+    def __init__(self, pages=None, route=None):
+        self.pages = pages or {}
+        self.route = route
+        self.round_trips = 0
+        self.current_url = ""
+        self.page_html = "<html><body></body></html>"
+        self.tree = lxml_html.fromstring(self.page_html)
+        self.window_handles = ["main"]
+        self.switch_to = self
+        self._article_added = 0
+
+    # --- ナビゲーション ---
+    def get(self, url):
+        self.round_trips += 1
+        self.current_url = url
+        html = self.pages.get(url)
+        if html is None and self.route is not None:
+            html = self.route(url)
+        self.load(html or "<html><body></body></html>")
+
+    def load(self, html):
+        """HTMLを現在のページとして読み込む（round_trips には数えない）"""
+        self.page_html = html
+        self.tree = lxml_html.fromstring(html)
+        self._article_added = 0
+
+    @property
+    def page_source(self):
+        self.round_trips += 1
+        return self.page_html
+
+    def window(self, handle):
+        self.round_trips += 1
+
+    def close(self):
+        self.round_trips += 1
+
+    def quit(self):
+        pass
+
+    # --- 要素検索 ---
+    def _find(self, node, by, value, single):
+        self.round_trips += 1
+        xpath = css_to_xpath(value) if by == By.CSS_SELECTOR else value
+        nodes = [n for n in node.xpath(xpath) if isinstance(n, etree._Element)]
+        if single:
+            if not nodes:
+                raise NoSuchElementException(f"no such element: {value}")
+            return FakeElement(self, nodes[0])
+        return [FakeElement(self, n) for n in nodes]
+
+    def find_element(self, by=By.XPATH, value=None):
+        return self._find(self.tree, by, value, single=True)
+
+    def find_elements(self, by=By.XPATH, value=None):
+        return self._find(self.tree, by, value, single=False)
+
+    # --- execute_script ---
+    def execute_script(self, script, *args):
+        self.round_trips += 1
+        if script == sst.ARTICLE_OBSERVER_JS:
+            return self._article_added
+        if script == sst.EXTRACT_ARTICLES_JS:
+            return [self._article_data(a) for a in self._articles(self.tree)]
+        if script == sst.METRIC_LABELS_JS:
+            return self._metric_labels(args[0]._node, args[1])
+        if "scrollTo" in script:
+            # 実ブラウザでは新しいarticleが差し込まれる。待機が即座に終わるよう件数だけ進める
+            self._article_added += 1
+            return None
+        if "getEntriesByType" in script:
+            return 0
+        return None
+
+    @staticmethod
+    def _articles(node):
+        return node.xpath(".//article[@data-testid='tweet']")
+
+    def _article_data(self, article):
+        """EXTRACT_ARTICLES_JS と同じdictを返す"""
+        links = article.xpath(".//a[contains(@href, '/status/')]")
+        href = absolute_url(links[0].get("href")) if links else None
+        id_match = re.search(r"/status/(\d+)", href or "")
+        text_els = article.xpath(".//div[@data-testid='tweetText']")
+        handle = next(
+            (
+                (span.text or "").strip().replace("@", "")
+                for span in article.xpath(".//div[@data-testid='User-Name']//span")
+                if "@" in (span.text or "")
+            ),
+            "",
+        )
+        all_text = "".join(article.itertext())
+        return {
+            "url": href,
+            "id": id_match.group(1) if id_match else None,
+            "text": inner_text(text_els[0]) if text_els else None,
+            "images": [
+                img.get("src")
+                for img in article.xpath(".//img[contains(@src, 'twimg.com/media')]")
+            ],
+            "videos": [v.get("src") for v in article.xpath(".//video") if v.get("src")],
+            "has_media_html": bool(
+                article.xpath(
+                    ".//div[@data-testid='video-player-mini-ui-']"
+                    " | .//button[@aria-label='動画を再生'] | .//video"
+                )
+            ),
+            "reply_aria": bool(
+                article.xpath(".//div[contains(@aria-labelledby, 'rxyo3tk')]")
+            ),
+            "reply_text": "返信先" in all_text,
+            "quote_text": "引用" in all_text,
+            "button_count": len(article.xpath(".//div[@role='group']//button")),
+            "handle": handle,
+        }
+
+    @staticmethod
+    def _metric_labels(article, testids):
+        """METRIC_LABELS_JS と同じ並び（グループdiv → ボタン）でaria-labelを返す"""
+        groups = [
+            div.get("aria-label")
+            for div in article.xpath(".//div[@aria-label]")
+            if sst.METRIC_GROUP_LABEL_RE.search(div.get("aria-label"))
+        ]
+        buttons = [
+            btn.get("aria-label")
+            for btn in article.xpath(".//button[@data-testid]")
+            if btn.get("data-testid") in testids and btn.get("aria-label")
+        ]
+        return groups + buttons
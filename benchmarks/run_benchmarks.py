@@ -0,0 +1,298 @@
+"""
+ライブのXセッションなしでスクレイパーのホットパスを計測するベンチマーク。
+benchmarks/fixtures の保存済みHTML（タイムライン・投稿詳細・ユーザー検索）を
+FakeDriver で再生し、関数ごとに1回あたりの所要時間とWebDriver往復回数を出力する。
+
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --iterations 50 --json bench.json
+    python benchmarks/run_benchmarks.py --baseline bench.json --tolerance 0.2
+
+--baseline 指定時は、平均所要時間が tolerance を超えて悪化したか、
+WebDriver往復回数が増えた項目があれば終了コード1で終わる。
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import scrape_and_save_tweets as sst  # noqa: E402
+from fake_webdriver import FakeDriver  # noqa: E402
+from PIL import Image, ImageDraw  # noqa: E402
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+TARGET = "alice"
+DETAIL_URL = "https://x.com/alice/status/1790000000000024000"
+
+
+def load_fixture(name, fixtures_dir=FIXTURES_DIR):
+    with open(os.path.join(fixtures_dir, name), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def route(fixtures):
+    def pick(url):
+        if "/search?" in url:
+            return fixtures["search"]
+        if "/status/" in url:
+            return fixtures["detail"]
+        return fixtures["timeline"]
+
+    return pick
+
+
+def prepare_module(log_level="INFO"):
+    """ネットワーク・Notionに触れないようモジュールの状態を差し替える"""
+    sst.EXTRACT_TARGET = TARGET
+    sst.registered_index = sst.RegisteredIndex(":memory:")
+    sst.registered_index.synced = True
+    sst.crawl_journal = None
+    sst.profile_cache = None
+    sst.SAVE_MEDIA_FILES = False
+    # 本番と同じくQueueHandler経由でフォーマットまで行い、出力だけ捨てる
+    sst.setup_logging(log_level, "json", os.devnull)
+    # ネットワークアイドル待ちは実ブラウザの通信待ちのため計測対象外（問い合わせ1回として数える）
+    sst.wait_for_network_idle = lambda driver, *args, **kwargs: bool(
+        driver.execute_script("return performance.getEntriesByType('resource').length")
+        is not None
+    )
+
+
+def make_ocr_image():
+    image = Image.new("RGB", (640, 200), "white")
+    draw = ImageDraw.Draw(image)
+    for i, line in enumerate(["Commission open", "Price list 2024", "DM for details"]):
+        draw.text((20, 20 + i * 50), line, fill="black")
+    buf = io.BytesIO()
+    image.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def build_cases(fixtures):
+    """(名前, 準備関数, 計測関数) の一覧。準備関数の戻り値が計測関数に渡される"""
+
+    def driver_at(url):
+        def setup():
+            driver = FakeDriver(route=route(fixtures))
+            driver.get(url)
+            driver.round_trips = 0
+            return driver
+
+        return setup
+
+    def first_article(url):
+        def setup():
+            driver = driver_at(url)()
+            article = driver.find_elements(
+                sst.By.XPATH, "//article[@data-testid='tweet']"
+            )[0]
+            driver.round_trips = 0
+            return driver, article
+
+        return setup
+
+    def with_engine(engine, fn):
+        def run(arg):
+            sst.TIMELINE_ENGINE = engine
+            return fn(arg)
+
+        return run
+
+    def with_parser(parser, fn):
+        def run(arg):
+            sst.DETAIL_PARSER = parser
+            return fn(arg)
+
+        return run
+
+    def ocr_input(data):
+        def setup():
+            # tesseract 未導入の環境では ocr_image がエラー文字列を返すだけなので計測しない
+            sst.pytesseract.get_tesseract_version()
+            return data
+
+        return setup
+
+    fresh_driver = lambda: FakeDriver(route=route(fixtures))  # noqa: E731
+    ocr_bytes = make_ocr_image()
+
+    return [
+        (
+            "extract_tweets[js]",
+            fresh_driver,
+            with_engine("js", lambda d: sst.extract_tweets(d, TARGET, 100)),
+        ),
+        (
+            "extract_tweets[webdriver]",
+            fresh_driver,
+            with_engine("webdriver", lambda d: sst.extract_tweets(d, TARGET, 100)),
+        ),
+        (
+            "extract_thread_from_detail_page[html]",
+            fresh_driver,
+            with_parser(
+                "html", lambda d: sst.extract_thread_from_detail_page(d, DETAIL_URL)
+            ),
+        ),
+        (
+            "extract_thread_from_detail_page[webdriver]",
+            fresh_driver,
+            with_parser(
+                "webdriver",
+                lambda d: sst.extract_thread_from_detail_page(d, DETAIL_URL),
+            ),
+        ),
+        (
+            "extract_metrics",
+            first_article(DETAIL_URL),
+            lambda arg: sst.extract_metrics(arg[1]),
+        ),
+        (
+            "parse_metrics_labels",
+            lambda: [
+                "12 件の返信、345 件のリポスト、1.2万 件のいいね、678 件のブックマーク、56万 件の表示",
+                "12 replies, 345 reposts, 5.6K likes, 678 bookmarks, 1.2M views",
+            ],
+            lambda labels: [sst.parse_metrics_labels([label]) for label in labels],
+        ),
+        (
+            "is_reply_structure",
+            first_article(DETAIL_URL),
+            lambda arg: sst.is_reply_structure(arg[1], tweet_id="1", text="x"),
+        ),
+        (
+            "extract_self_replies",
+            driver_at(DETAIL_URL),
+            lambda d: sst.extract_self_replies(d, TARGET),
+        ),
+        (
+            "search_accounts",
+            fresh_driver,
+            lambda d: sst.search_accounts(d, ["依頼"]),
+        ),
+        ("ocr_image", ocr_input(ocr_bytes), sst.ocr_image),
+    ]
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_case(setup, fn, iterations):
+    timings = []
+    round_trips = []
+    sink = io.StringIO()
+    for _ in range(iterations):
+        arg = setup()
+        driver = arg[0] if isinstance(arg, tuple) else arg
+        with contextlib.redirect_stdout(sink):
+            started = time.perf_counter()
+            fn(arg)
+            timings.append((time.perf_counter() - started) * 1000)
+        sink.seek(0)
+        sink.truncate()
+        if isinstance(driver, FakeDriver):
+            round_trips.append(driver.round_trips)
+    return {
+        "iterations": iterations,
+        "mean_ms": statistics.mean(timings),
+        "p50_ms": percentile(timings, 0.5),
+        "p95_ms": percentile(timings, 0.95),
+        "round_trips": statistics.mean(round_trips) if round_trips else None,
+    }
+
+
+def print_report(results):
+    print(
+        f"{'benchmark':<45} {'mean ms':>10} {'p50 ms':>10} {'p95 ms':>10} {'WD往復':>8}"
+    )
+    for name, r in results.items():
+        if "skipped" in r:
+            print(f"{name:<45} {'skipped: ' + r['skipped']}")
+            continue
+        trips = "-" if r["round_trips"] is None else f"{r['round_trips']:.0f}"
+        print(
+            f"{name:<45} {r['mean_ms']:>10.2f} {r['p50_ms']:>10.2f} {r['p95_ms']:>10.2f} {trips:>8}"
+        )
+
+
+def compare_with_baseline(results, baseline, tolerance):
+    regressions = []
+    for name, r in results.items():
+        base = baseline.get(name)
+        if not base or "skipped" in r or "skipped" in base:
+            continue
+        if r["mean_ms"] > base["mean_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{name}: mean {base['mean_ms']:.2f}ms → {r['mean_ms']:.2f}ms"
+            )
+        if (
+            r["round_trips"] is not None
+            and base["round_trips"] is not None
+            and r["round_trips"] > base["round_trips"]
+        ):
+            regressions.append(
+                f"{name}: WebDriver往復 {base['round_trips']:.0f} → {r['round_trips']:.0f}"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument(
+        "--fixtures", default=FIXTURES_DIR, help="HTMLフィクスチャの場所"
+    )
+    parser.add_argument("--only", nargs="*", help="実行するベンチマーク名（前方一致）")
+    parser.add_argument("--json", help="結果をJSONで保存するパス")
+    parser.add_argument("--baseline", help="比較対象の結果JSON")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--log-level", default="INFO", help="計測中のログレベル")
+    args = parser.parse_args()
+
+    fixtures = {
+        name: load_fixture(f"{name}.html", args.fixtures)
+        for name in ("timeline", "detail", "search")
+    }
+    prepare_module(args.log_level)
+
+    results = {}
+    for name, setup, fn in build_cases(fixtures):
+        if args.only and not any(name.startswith(p) for p in args.only):
+            continue
+        try:
+            results[name] = run_case(setup, fn, args.iterations)
+        except Exception as e:
+            results[name] = {"skipped": f"{type(e).__name__}: {e}".splitlines()[0]}
+
+    print_report(results)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 結果を保存: {args.json}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(results, baseline, args.tolerance)
+        if regressions:
+            print("\n❌ 性能劣化を検出:")
+            for line in regressions:
+                print(f"  - {line}")
+            sys.exit(1)
+        print("\n✅ ベースラインからの劣化なし")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,134 @@
 import os
 import re
 import cv2
+import numpy as np
 import time
+import sys
 import json
+import atexit
+import base64
+import hashlib
+import socket
+import uuid
+import random
+import signal
+import logging
+import logging.handlers
+import queue
+import sqlite3
 import argparse
+import threading
 import traceback
+import functools
+import unicodedata
 import requests
 import pytesseract
-from PIL import Image, ImageFilter, ImageEnhance
-from bs4 import BeautifulSoup
+from PIL import Image
+from bs4 import BeautifulSoup, NavigableString, SoupStrainer
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import StaleElementReferenceException
+from selenium.common.exceptions import (
+    StaleElementReferenceException,
+    TimeoutException,
+)
 from notion_client import Client
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+from urllib.parse import unquote
 import shutil
+import glob
+from io import BytesIO
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# ✅ ログ設定（QueueHandler で書き出しを別スレッドに逃がし、呼び出し側はI/Oを待たない）
+LOG_LEVEL = "INFO"
+LOG_FORMAT = "json"  # "json"（1行1JSON）/ "text"（メッセージのみ）
+LOG_PATH = None  # None なら標準出力
+
+log = logging.getLogger("scrape_and_save_tweets")
+log_listener = None
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """1レコード1行のコンパクトなJSON（ts, level, msg, 例外があれば exc）"""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "msg": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, separators=(",", ":"))
+
+
+def make_log_handler(fmt=None, path=None):
+    fmt = fmt or LOG_FORMAT
+    path = path or LOG_PATH
+    if path:
+        handler = logging.FileHandler(path, encoding="utf-8")
+    else:
+        handler = logging.StreamHandler(sys.stdout)
+    if fmt == "json":
+        handler.setFormatter(JsonLinesFormatter())
+    else:
+        handler.setFormatter(logging.Formatter("%(message)s"))
+    return handler
+
+
+def setup_logging(level=None, fmt=None, path=None):
+    """
+    log に QueueHandler だけを付け、実際の書き出しは QueueListener のスレッドで行う。
+    レベル未満の log.debug(...) は引数の文字列化も行われない。
+    """
+    global log_listener, LOG_LEVEL, LOG_FORMAT, LOG_PATH
+    shutdown_logging()
+    LOG_LEVEL = str(level or LOG_LEVEL).upper()
+    LOG_FORMAT = fmt or LOG_FORMAT
+    LOG_PATH = path or LOG_PATH
+    log_queue = queue.SimpleQueue()
+    log.handlers[:] = [logging.handlers.QueueHandler(log_queue)]
+    log.setLevel(LOG_LEVEL)
+    log.propagate = False
+    log_listener = logging.handlers.QueueListener(
+        log_queue, make_log_handler(LOG_FORMAT, LOG_PATH)
+    )
+    log_listener.start()
+    return log
+
+
+def shutdown_logging():
+    """キューに残ったログを書き出してリスナーを止める"""
+    global log_listener
+    if log_listener is not None:
+        log_listener.stop()
+        log_listener = None
+
+
+atexit.register(shutdown_logging)
+
+
+def init_worker_logging(level, fmt, path):
+    """
+    ProcessPoolExecutor の子プロセス用の initializer。
+    親のキューは子プロセスから読まれないため、子では直接ハンドラに書き出す。
+    """
+    log.handlers[:] = [make_log_handler(fmt, path)]
+    log.setLevel(level)
+    log.propagate = False
+
+
+def worker_logging_args():
+    return (LOG_LEVEL, LOG_FORMAT, LOG_PATH)
+
 
 # ✅ 広告除外、RT/引用RTルール、投稿ID補完付き
 AD_KEYWORDS = [
@@ -45,10 +155,249 @@ def normalize_text(text):
     return text.strip()
 
 
+class KeywordMatcher:
+    """
+    キーワード一覧を1本の正規表現にまとめた判定器。
+    NFKC正規化（全角/半角の統一）と casefold で大文字小文字を区別せずに照合し、
+    どのキーワードに一致したかを返す。
+    keywords は一覧、または {キーワード: 重み} の辞書。
+    min_score 指定時は一致したキーワードの重みの合計がそれ以上のときのみ一致とみなす。
+    """
+
+    def __init__(self, keywords, min_score=None):
+        if isinstance(keywords, dict):
+            weighted = keywords.items()
+        else:
+            weighted = ((k, 1) for k in keywords or [])
+        self.weights = {}
+        self.originals = {}
+        for keyword, weight in weighted:
+            key = self.normalize(keyword)
+            if key:
+                self.weights[key] = float(weight)
+                self.originals.setdefault(key, keyword)
+        self.min_score = min_score
+        # 先読みにして全位置から照合し、重なり合うキーワード（「求人」と「人材」in「求人材」）も拾う。
+        # 同じ位置では最長のものだけが一致するため、その接頭辞になっているキーワードも併せて数える
+        by_length = sorted(self.weights, key=len, reverse=True)
+        self.pattern = (
+            re.compile("(?=(" + "|".join(re.escape(k) for k in by_length) + "))")
+            if self.weights
+            else None
+        )
+        self.prefixes = {
+            k: [p for p in reversed(by_length) if k.startswith(p)] for k in by_length
+        }
+        self.signature = hashlib.sha256(
+            json.dumps(
+                [sorted(self.weights.items()), min_score], ensure_ascii=False
+            ).encode("utf-8")
+        ).hexdigest()
+
+    @staticmethod
+    def normalize(text):
+        return unicodedata.normalize("NFKC", text or "").casefold()
+
+    def __bool__(self):
+        return self.pattern is not None
+
+    def __iter__(self):
+        return iter(self.originals.values())
+
+    def find_all(self, *texts):
+        """一致したキーワード（元の表記）を出現順・重複なしで返す"""
+        if self.pattern is None:
+            return []
+        found = {}
+        for text in texts:
+            for m in self.pattern.finditer(self.normalize(text)):
+                for key in self.prefixes[m.group(1)]:
+                    found.setdefault(key, None)
+        return [self.originals[k] for k in found]
+
+    def score(self, *texts):
+        return sum(self.weights[self.normalize(k)] for k in self.find_all(*texts))
+
+    def match(self, *texts):
+        """一致と判定したキーワード一覧を返す（非一致なら空リスト）"""
+        if self.pattern is None:
+            return []
+        if self.min_score is None:
+            for text in texts:
+                m = self.pattern.search(self.normalize(text))
+                if m:
+                    return [self.originals[m.group(1)]]
+            return []
+        found = self.find_all(*texts)
+        score = sum(self.weights[self.normalize(k)] for k in found)
+        return found if score >= self.min_score else []
+
+
+def as_keyword_matcher(keywords, min_score=None):
+    if isinstance(keywords, KeywordMatcher):
+        return keywords
+    return KeywordMatcher(keywords, min_score)
+
+
+AD_MATCHER = KeywordMatcher(AD_KEYWORDS)
+
+
+# 実行時メトリクス（処理段階ごとの所要時間ヒストグラム・件数・WebDriver呼び出し数）
+METRICS_PATH = "scrape_metrics.prom"
+METRICS_BUCKETS = (0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+
+
+class RunMetrics:
+    """
+    スレッドセーフな集計器。終了時に Prometheus テキスト形式（.prom）または JSON で書き出す。
+    """
+
+    def __init__(self, buckets=METRICS_BUCKETS):
+        self.buckets = buckets
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._histograms = {}  # stage → [バケットごとの件数, 合計秒, 件数]
+        self._counters = {}  # (name, ((label, value), ...)) → 値
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            hist = self._histograms.setdefault(stage, [[0] * len(self.buckets), 0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    hist[0][i] += 1
+            hist[1] += seconds
+            hist[2] += 1
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def summary(self):
+        with self._lock:
+            return {
+                "started_at": self.started_at,
+                "duration_seconds": time.time() - self.started_at,
+                "stages": {
+                    stage: {
+                        "count": count,
+                        "sum_seconds": total,
+                        "buckets": dict(zip(map(str, self.buckets), counts)),
+                    }
+                    for stage, (counts, total, count) in self._histograms.items()
+                },
+                "counters": [
+                    {"name": name, "labels": dict(labels), "value": value}
+                    for (name, labels), value in sorted(self._counters.items())
+                ],
+            }
+
+    def to_prometheus(self):
+        summary = self.summary()
+        lines = [
+            "# HELP scraper_stage_seconds 処理段階ごとの所要時間",
+            "# TYPE scraper_stage_seconds histogram",
+        ]
+        for stage, hist in summary["stages"].items():
+            for bound, count in hist["buckets"].items():
+                lines.append(
+                    f'scraper_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {count}'
+                )
+            lines.append(
+                f'scraper_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {hist["count"]}'
+            )
+            lines.append(
+                f'scraper_stage_seconds_sum{{stage="{stage}"}} {hist["sum_seconds"]:.6f}'
+            )
+            lines.append(
+                f'scraper_stage_seconds_count{{stage="{stage}"}} {hist["count"]}'
+            )
+        declared = set()
+        for counter in summary["counters"]:
+            name = f"scraper_{counter['name']}_total"
+            if name not in declared:
+                lines.append(f"# TYPE {name} counter")
+                declared.add(name)
+            labels = ",".join(f'{k}="{v}"' for k, v in counter["labels"].items())
+            if labels:
+                name = f"{name}{{{labels}}}"
+            lines.append(f"{name} {counter['value']}")
+        lines += [
+            "# TYPE scraper_run_started_timestamp_seconds gauge",
+            f"scraper_run_started_timestamp_seconds {summary['started_at']:.0f}",
+            "# TYPE scraper_run_duration_seconds gauge",
+            f"scraper_run_duration_seconds {summary['duration_seconds']:.3f}",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """node exporter が書きかけを読まないよう一時ファイル経由で置き換える"""
+        if path.endswith(".json"):
+            body = json.dumps(self.summary(), ensure_ascii=False, indent=2)
+        else:
+            body = self.to_prometheus()
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(body)
+        os.replace(tmp_path, path)
+        log.info("📈 メトリクスを書き出し: %s", path)
+
+
+run_metrics = RunMetrics()
+
+
+def instrumented(stage):
+    """関数の所要時間を stage 名で run_metrics に記録するデコレータ"""
+
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            except Exception:
+                run_metrics.inc("stage_errors", stage=stage)
+                raise
+            finally:
+                run_metrics.observe(stage, time.perf_counter() - started)
+
+        return wrapper
+
+    return decorate
+
+
+def timed_call(fn, *args):
+    """別プロセスで実行し、(結果, 所要秒) を返す（子プロセス側の計測を親へ戻す）"""
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+def instrument_driver(driver):
+    """
+    WebDriverの全コマンドが通る driver.execute を包み、コマンド別の呼び出し数と所要時間を数える
+    """
+    execute = driver.execute
+    driver.page_loads = 0  # 常駐モードでブラウザを起動し直す目安
+
+    def counted_execute(driver_command, params=None):
+        if driver_command == "get":
+            driver.page_loads += 1
+        started = time.perf_counter()
+        try:
+            return execute(driver_command, params)
+        finally:
+            run_metrics.observe("webdriver_call", time.perf_counter() - started)
+            run_metrics.inc("webdriver_calls", command=driver_command)
+
+    driver.execute = counted_execute
+    return driver
+
+
 def login(driver, target=None):
     if os.path.exists("twitter_cookies.json"):
-        print("✅ Cookieセッション検出 → ログインスキップ")
-        print("🌐 https://twitter.com にアクセスしてクッキー読み込み中…")
+        log.info("✅ Cookieセッション検出 → ログインスキップ")
+        log.info("🌐 https://twitter.com にアクセスしてクッキー読み込み中…")
         driver.get("https://twitter.com/")
         driver.delete_all_cookies()
         with open("twitter_cookies.json", "r") as f:
@@ -58,14 +407,14 @@ def login(driver, target=None):
         driver.get(f"https://twitter.com/{target or TWITTER_USERNAME}")
         return
 
-    print("🔐 初回ログイン処理を開始")
+    log.info("🔐 初回ログイン処理を開始")
     driver.get("https://twitter.com/i/flow/login")
     email_input = WebDriverWait(driver, 20).until(
         EC.presence_of_element_located((By.NAME, "text"))
     )
     email_input.send_keys(TWITTER_EMAIL)
     email_input.send_keys(Keys.ENTER)
-    time.sleep(2)
+    wait_for_staleness(email_input, READINESS_TIMEOUTS["login_step"])
 
     try:
         username_input = WebDriverWait(driver, 5).until(
@@ -73,32 +422,212 @@ def login(driver, target=None):
         )
         username_input.send_keys(TWITTER_USERNAME)
         username_input.send_keys(Keys.ENTER)
-        time.sleep(2)
+        wait_for_staleness(username_input, READINESS_TIMEOUTS["login_step"])
     except Exception:
-        print("👤 ユーザー名入力スキップ")
+        log.info("👤 ユーザー名入力スキップ")
 
     password_input = WebDriverWait(driver, 10).until(
         EC.presence_of_element_located((By.NAME, "password"))
     )
     password_input.send_keys(TWITTER_PASSWORD)
     password_input.send_keys(Keys.ENTER)
-    time.sleep(6)
+    try:
+        WebDriverWait(driver, READINESS_TIMEOUTS["login"]).until(
+            lambda d: d.get_cookie("auth_token")
+        )
+    except TimeoutException:
+        log.warning("⚠️ auth_token Cookieを確認できませんでした → 現在のCookieを保存")
 
     cookies = driver.get_cookies()
     with open("twitter_cookies.json", "w") as f:
         json.dump(cookies, f)
-    print("✅ ログイン成功 → 投稿者ページに遷移")
+    log.info("✅ ログイン成功 → 投稿者ページに遷移")
     driver.get(f"https://twitter.com/{EXTRACT_TARGET}")
 
 
-def setup_driver():
+# 投稿の取得方式: "dom"（画面のHTMLから抽出）/ "graphql"（XのGraphQLレスポンスJSONから構築）
+CAPTURE_BACKEND = "dom"
+
+
+# ブラウザ設定: "default"（画面表示あり・全リソース読み込み）/ "lean"（ヘッドレス・メディア/フォント遮断）
+BROWSER_PROFILE = "default"
+# lean 時に使い回すChromeのユーザーデータディレクトリ（2台目以降は _2, _3 … を付与）
+USER_DATA_DIR = "chrome_profile"
+
+# lean 時に読み込まないURL（画像URLはDOMの src 属性から取得できるため読み込み不要）
+BLOCKED_URL_PATTERNS = [
+    "*video.twimg.com*",
+    "*.mp4*",
+    "*.m3u8*",
+    "*.m4s*",
+    "*pbs.twimg.com/media/*",
+    "*pbs.twimg.com/*video_thumb/*",
+    "*pbs.twimg.com/card_img/*",
+    "*pbs.twimg.com/profile_images/*",
+    "*pbs.twimg.com/profile_banners/*",
+    "*.woff*",
+    "*.ttf*",
+    "*.otf*",
+]
+
+
+def setup_driver(worker_index=0):
     options = Options()
     # options.add_argument("--headless=new")  ← この行をコメントアウト
     options.add_argument("--disable-gpu")
     options.add_argument("--window-size=1920,1080")
     options.add_argument("--lang=ja-JP")
     options.add_argument("--disable-blink-features=AutomationControlled")
-    return webdriver.Chrome(options=options)
+    if BROWSER_PROFILE == "lean":
+        options.add_argument("--headless=new")
+        options.add_argument("--autoplay-policy=user-gesture-required")
+        options.add_argument("--mute-audio")
+        user_data_dir = USER_DATA_DIR
+        if worker_index:
+            user_data_dir = f"{USER_DATA_DIR}_{worker_index + 1}"
+        options.add_argument(f"--user-data-dir={os.path.abspath(user_data_dir)}")
+    if CAPTURE_BACKEND == "graphql":
+        # Network.* イベントをパフォーマンスログとして受け取る
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    driver = webdriver.Chrome(options=options)
+    if BROWSER_PROFILE == "lean":
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+    return instrument_driver(driver)
+
+
+# 固定sleepの代わりに実際の条件を待つ際のタイムアウト（秒）。
+# 条件が満たされればすぐ次へ進むため、値は従来のsleep時間を上限の目安にしている
+READINESS_TIMEOUTS = {
+    "page": 10,  # 詳細ページ・検索結果の主要要素
+    "scroll": 1.5,  # スクロール1回ごとの新規article追加
+    "search_scroll": 2,  # 検索結果のスクロール1回ごとの新規article追加
+    "profile": 5,  # プロフィールの UserDescription / UserProfileHeader_Items
+    "login_step": 2,  # ログインフォームの画面遷移
+    "login": 20,  # ログイン完了（auth_token Cookie）
+    "network_idle": 3,  # ネットワークアイドル待ちの上限
+    "idle_window": 0.5,  # この時間リソース取得がなければアイドルとみなす
+}
+
+# article追加を数えるMutationObserverを注入し、累計の追加数を返す（遷移ごとに再注入）
+ARTICLE_OBSERVER_JS = """
+if (!window.__articleObserver) {
+  window.__articleAdded = 0;
+  window.__articleObserver = new MutationObserver((mutations) => {
+    for (const m of mutations) {
+      for (const n of m.addedNodes) {
+        if (
+          n.nodeType === 1 &&
+          (n.matches("article[data-testid='tweet']") ||
+            n.querySelector("article[data-testid='tweet']"))
+        ) {
+          window.__articleAdded++;
+        }
+      }
+    }
+  });
+  window.__articleObserver.observe(document.body, { childList: true, subtree: true });
+}
+return window.__articleAdded;
+"""
+
+
+def article_mutation_count(driver):
+    return driver.execute_script(ARTICLE_OBSERVER_JS) or 0
+
+
+def wait_for_article_change(driver, baseline, timeout=None):
+    """
+    article_mutation_count が baseline を超える（新しいarticleが追加される）まで待つ
+    """
+    try:
+        WebDriverWait(
+            driver, timeout or READINESS_TIMEOUTS["scroll"], poll_frequency=0.1
+        ).until(lambda d: article_mutation_count(d) > baseline)
+        return True
+    except TimeoutException:
+        return False
+
+
+def wait_for_network_idle(driver, timeout=None, idle_window=None):
+    """
+    Resource Timing のエントリ数が idle_window 秒間増えなくなるまで待つ
+    """
+    timeout = timeout or READINESS_TIMEOUTS["network_idle"]
+    idle_window = idle_window or READINESS_TIMEOUTS["idle_window"]
+    deadline = time.monotonic() + timeout
+    last_count = -1
+    last_change = time.monotonic()
+    while time.monotonic() < deadline:
+        count = driver.execute_script(
+            "return performance.getEntriesByType('resource').length"
+        )
+        now = time.monotonic()
+        if count != last_count:
+            last_count = count
+            last_change = now
+        elif now - last_change >= idle_window:
+            return True
+        time.sleep(0.1)
+    return False
+
+
+def wait_for_testid(driver, testids, timeout=None):
+    """
+    指定した data-testid のいずれかが現れるまで待ち、見つかったtestidを返す（なければNone）
+    """
+    if isinstance(testids, str):
+        testids = [testids]
+    selector = ", ".join(f"[data-testid='{t}']" for t in testids)
+    try:
+        el = WebDriverWait(driver, timeout or READINESS_TIMEOUTS["page"]).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, selector))
+        )
+        return el.get_attribute("data-testid")
+    except TimeoutException:
+        return None
+
+
+def wait_for_staleness(element, timeout):
+    """
+    画面遷移で element が置き換わるまで待つ（最大 timeout 秒）
+    """
+    try:
+        WebDriverWait(element.parent, timeout, poll_frequency=0.1).until(
+            EC.staleness_of(element)
+        )
+    except TimeoutException:
+        pass
+
+
+def fetch_profile_bio(driver, username):
+    """
+    新しいタブでプロフィールを開き、UserDescription（bio）を返す（取得失敗時はNone）。
+    bio は UserName より後に描画されることがあるため、bio か、その下に並ぶ
+    UserProfileHeader_Items（参加日など。bioがなくても表示される）が現れるまで待ち、
+    どちらも現れなければ bio なしと区別できないため None を返す（キャッシュさせない）
+    """
+    driver.execute_script("window.open('');")
+    driver.switch_to.window(driver.window_handles[-1])
+    try:
+        driver.get(f"https://twitter.com/{username}")
+        found = wait_for_testid(
+            driver,
+            ["UserDescription", "UserProfileHeader_Items"],
+            READINESS_TIMEOUTS["profile"],
+        )
+        if found is None:
+            log.warning("⚠️ プロフィールを読み込めませんでした: @%s", username)
+            return None
+        bio_els = driver.find_elements(
+            By.XPATH, "//div[@data-testid='UserDescription']"
+        )
+        return bio_els[0].text if bio_els else ""
+    except Exception:
+        return None
+    finally:
+        driver.close()
+        driver.switch_to.window(driver.window_handles[0])
 
 
 def extract_tweet_id(article):
@@ -111,26 +640,62 @@ def extract_tweet_id(article):
     return None
 
 
-def ocr_image(image_path):
+# PIL の ImageFilter.SHARPEN と同じカーネル
+SHARPEN_KERNEL = (
+    np.array([[-2, -2, -2], [-2, 32, -2], [-2, -2, -2]], dtype=np.float32) / 16
+)
+
+
+def read_image_bytes(image):
+    """
+    画像のバイト列を返す（image はファイルパスまたはバイト列）
+    """
+    if isinstance(image, (bytes, bytearray)):
+        return bytes(image)
+    with open(image, "rb") as f:
+        return f.read()
+
+
+def decode_grayscale(data):
+    """
+    バイト列をグレースケールのNumPy配列へ直接デコードする
+    """
+    img_np = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_GRAYSCALE)
+    if img_np is None:
+        # cv2が未対応の形式（GIF等）はPILでデコード
+        img_np = np.array(Image.open(BytesIO(data)).convert("L"))
+    return img_np
+
+
+@instrumented("ocr_image")
+def ocr_image(image):
+    """
+    画像（ファイルパスまたはバイト列）をOCRする。
+    デコードから二値化までNumPy配列のまま行い、一時ファイルを使わない。
+    """
+    name = image if isinstance(image, str) else f"{len(image)} bytes"
     try:
-        img = Image.open(image_path)
-        img = img.convert("L")
-        img = img.resize((img.width * 2, img.height * 2))
-        img = ImageEnhance.Contrast(img).enhance(2.0)
-        img = img.filter(ImageFilter.SHARPEN)
-        import numpy as np
-
-        img_np = np.array(img)
+        img_np = decode_grayscale(read_image_bytes(image))
+        img_np = cv2.resize(
+            img_np,
+            (img_np.shape[1] * 2, img_np.shape[0] * 2),
+            interpolation=cv2.INTER_CUBIC,
+        )
+        # ImageEnhance.Contrast(2.0) 相当: 平均輝度を中心にコントラストを2倍
+        mean = float(img_np.mean())
+        img_np = cv2.addWeighted(img_np, 2.0, img_np, 0, -mean)
+        img_np = cv2.filter2D(img_np, -1, SHARPEN_KERNEL)
         img_np = cv2.medianBlur(img_np, 3)
         _, img_np = cv2.threshold(img_np, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-        img = Image.fromarray(img_np)
-        text = pytesseract.image_to_string(img, lang="jpn", config="--oem 1 --psm 6")
-        print(f"📝 OCR画像({image_path})結果:\n{text.strip()}")
-        if not text.strip() or sum(c.isalnum() for c in text) < 3:
-            print(f"⚠️ OCR画像({image_path})で文字化けまたは認識失敗の可能性")
-        return text.strip()
+        text = pytesseract.image_to_string(
+            img_np, lang="jpn", config="--oem 1 --psm 6"
+        ).strip()
+        log.debug("📝 OCR画像(%s)結果:\n%s", name, text)
+        if not text or sum(c.isalnum() for c in text) < 3:
+            log.warning("⚠️ OCR画像(%s)で文字化けまたは認識失敗の可能性", name)
+        return text
     except Exception as e:
-        print(f"OCR失敗({image_path}): {e}")
+        log.warning("OCR失敗(%s): %s", name, e)
         return "[OCRエラー]"
 
 
@@ -159,174 +724,573 @@ def extract_self_replies(driver, username):
                 if t:
                     texts.append(t)
         if any("もっと見つける" in t for t in texts):
-            print("🔝 extract_self_replies: もっと見つける以降のリプライを除外")
+            log.debug("🔝 extract_self_replies: もっと見つける以降のリプライを除外")
             break
 
         articles = cell.find_elements(By.XPATH, ".//article[@data-testid='tweet']")
+        for article in articles:
+            reply = self_reply_from_article(article, username)
+            if reply:
+                replies.append(reply)
+    return replies
 
-        def is_quote_reply(article):
-            # 「引用」や「Quote」などの文言や、引用構造を持つ要素を判定
-            quote_els = article.find_elements(
-                By.XPATH,
-                ".//*[contains(text(), '引用')] | .//*[contains(text(), 'Quote')]",
-            )
-            # 追加: 引用構造のdivやaria-labelも判定
-            quote_struct = article.find_elements(
-                By.XPATH, ".//div[contains(@aria-label, '引用')]"
-            )
-            return bool(quote_els or quote_struct)
 
-        for article in articles:
-            try:
-                handle_el = article.find_element(
-                    By.XPATH,
-                    ".//div[@data-testid='User-Name']//span[contains(text(), '@')]",
-                )
-                handle = handle_el.text.strip()
-                if handle.replace("@", "") != username:
-                    continue
+def self_reply_from_article(article, username):
+    """
+    article が username 本人の（引用RTでない）投稿なら {"id", "text"} を返す
+    """
 
-                # 引用RT形式ならスキップ
-                if is_quote_reply(article):
-                    print("⚠️ extract_self_replies: 引用RT形式のためスキップ")
-                    continue
+    def is_quote_reply(article):
+        # 「引用」や「Quote」などの文言や、引用構造を持つ要素を判定
+        quote_els = article.find_elements(
+            By.XPATH,
+            ".//*[contains(text(), '引用')] | .//*[contains(text(), 'Quote')]",
+        )
+        # 追加: 引用構造のdivやaria-labelも判定
+        quote_struct = article.find_elements(
+            By.XPATH, ".//div[contains(@aria-label, '引用')]"
+        )
+        return bool(quote_els or quote_struct)
 
-                text_el = article.find_element(
-                    By.XPATH, ".//div[@data-testid='tweetText']"
-                )
-                reply_text = text_el.text.strip() if text_el and text_el.text else ""
+    try:
+        handle_el = article.find_element(
+            By.XPATH,
+            ".//div[@data-testid='User-Name']//span[contains(text(), '@')]",
+        )
+        handle = handle_el.text.strip()
+        if handle.replace("@", "") != username:
+            return None
 
-                tweet_id = extract_tweet_id(article)
+        # 引用RT形式ならスキップ
+        if is_quote_reply(article):
+            log.debug("⚠️ extract_self_replies: 引用RT形式のためスキップ")
+            return None
 
-                if not tweet_id:
-                    print("⚠️ extract_self_replies: tweet_idが取得できないためスキップ")
-                    continue
+        text_el = article.find_element(By.XPATH, ".//div[@data-testid='tweetText']")
+        reply_text = text_el.text.strip() if text_el and text_el.text else ""
 
-                if reply_text:
-                    replies.append({"id": tweet_id, "text": reply_text})
-            except Exception as e:
-                print(f"⚠️ リプライ抽出エラー: {e}")
-                continue
-    return replies
+        tweet_id = extract_tweet_id(article)
+
+        if not tweet_id:
+            log.debug("⚠️ extract_self_replies: tweet_idが取得できないためスキップ")
+            return None
+
+        if reply_text:
+            return {"id": tweet_id, "text": reply_text}
+    except Exception as e:
+        log.warning("⚠️ リプライ抽出エラー: %s", e)
+    return None
+
+
+def self_reply_from_soup(article, username):
+    """
+    self_reply_from_article のHTMLスナップショット版
+    """
+    if _find_handle(article) != username:
+        return None
+    if article.find(string=re.compile("引用|Quote")) or article.find(
+        "div", attrs={"aria-label": re.compile("引用")}
+    ):
+        log.debug("⚠️ extract_self_replies: 引用RT形式のためスキップ")
+        return None
+    link = article.find("a", href=re.compile(r"/status/\d+"))
+    m = re.search(r"/status/(\d+)", link.get("href", "")) if link else None
+    if not m:
+        log.debug("⚠️ extract_self_replies: tweet_idが取得できないためスキップ")
+        return None
+    reply_text = _tweet_text_from_soup(article)
+    return {"id": m.group(1), "text": reply_text} if reply_text else None
+
+
+def ad_keyword(text):
+    """広告キーワードに一致すればそのキーワードを返す"""
+    matched = AD_MATCHER.match(text)
+    return matched[0] if matched else None
 
 
 def is_ad_post(text):
-    lowered = text.lower()
-    return any(k.lower() in lowered for k in AD_KEYWORDS)
+    return ad_keyword(text) is not None
 
 
-def extract_thread_from_detail_page(driver, tweet_url):
-    print(f"\n🕵️ 投稿アクセス中: {tweet_url}")
+# extract_thread_from_detail_page の解析方式:
+# "html"（ページHTMLを1回だけ取得してオフライン解析）/ "webdriver"（要素ごとに問い合わせ）
+DETAIL_PARSER = "html"
+detail_parse_pool = None
+detail_parse_pool_lock = (
+    threading.Lock()
+)  # 複数のワーカースレッドが同時に作らないように
+
+# 投稿詳細ページを並列処理するブラウザ数（1なら従来どおりメインのdriverのみ）
+DETAIL_WORKERS = 1
+detail_drivers = []
+
+# 複数対象を並列処理する際のワーカースレッドごとの対象アカウント・詳細ページ用ブラウザ
+# （未設定のスレッドではモジュール変数の EXTRACT_TARGET / detail_drivers を使う）
+EXTRACT_TARGET = None
+worker_state = threading.local()
+
+
+def current_target():
+    return getattr(worker_state, "extract_target", EXTRACT_TARGET)
+
+
+def current_detail_drivers():
+    return getattr(worker_state, "detail_drivers", detail_drivers)
+
+
+def open_detail_page(driver, tweet_url):
+    """
+    投稿詳細ページを開き、articleが表示されるまで待つ。読み込めなければFalse
+    """
+    log.info("🕵️ 投稿アクセス中: %s", tweet_url)
     driver.get(tweet_url)
-    time.sleep(3)
 
+    # 投稿article か エラーページ のどちらかが表示されるまで待つ
+    found = wait_for_testid(driver, ["tweet", "error-detail", "emptyState"])
+    page_source = driver.page_source
     if (
-        "Something went wrong" in driver.page_source
-        or "このページは存在しません" in driver.page_source
+        "Something went wrong" in page_source
+        or "このページは存在しません" in page_source
     ):
-        print(f"❌ 投稿ページが読み込めませんでした: {tweet_url}")
-        return []
+        log.warning("❌ 投稿ページが読み込めませんでした: %s", tweet_url)
+        return False
+
+    if found != "tweet" and not driver.find_elements(
+        By.XPATH, "//article[@data-testid='tweet']"
+    ):
+        log.warning("⚠️ 投稿記事の取得に失敗: %s", tweet_url)
+        return False
+
+    # スレッド内のリプライ等の読み込みが落ち着くまで待つ
+    wait_for_network_idle(driver)
+    return True
 
+
+@instrumented("detail_page_load")
+def capture_detail_page_html(driver, tweet_url):
+    """
+    投稿詳細ページを開いてHTMLスナップショットを返す（読み込めなければNone）
+    """
+    if not open_detail_page(driver, tweet_url):
+        return None
+    return driver.page_source
+
+
+def download_video_poster(poster_url, tweet_id):
+    # poster画像をダウンロードして保存
+    poster_path = f"video_poster_{tweet_id}.jpg"
     try:
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_all_elements_located(
-                (By.XPATH, "//article[@data-testid='tweet']")
-            )
-        )
+        data = fetch_media_bytes(poster_url)
+        with open(poster_path, "wb") as f:
+            f.write(data)
+        log.info("🟩 poster画像保存: %s", poster_path)
+        return poster_path
     except Exception as e:
-        print(f"⚠️ 投稿記事の取得に失敗: {e}")
-        return []
+        log.warning("❌ poster画像保存失敗: %s", e)
+        return None
+
+
+def finalize_detail_thread(thread):
+    """
+    poster画像はURLのまま保持し、OCR時にメモリ上へ取得する。
+    save_media_files が有効な場合のみ従来どおりファイルに保存する（デバッグ用）
+    """
+    for post in thread:
+        poster_url = post.get("video_poster_url")
+        post["video_poster"] = None
+        if poster_url:
+            log.debug("🟦 poster画像URL: %s", poster_url)
+            if SAVE_MEDIA_FILES:
+                post["video_poster"] = download_video_poster(poster_url, post["id"])
+    return thread
+
+
+def _cleaned_texts(cell):
+    texts = []
+    for el in cell.find_all(["span", "h2"]):
+        t = (
+            el.get_text()
+            .strip()
+            .replace("\u200b", "")
+            .replace("\n", "")
+            .replace(" ", "")
+        )
+        if t:
+            texts.append(t)
+    return texts
+
+
+def _article_ancestors(tag):
+    return tag.find_parents("article", attrs={"data-testid": "tweet"})
+
+
+def _belongs_only_to(tag, article):
+    ancestors = _article_ancestors(tag)
+    return len(ancestors) == 1 and ancestors[0] is article
+
+
+def _find_handle(article):
+    name_div = article.find("div", attrs={"data-testid": "User-Name"})
+    if not name_div:
+        return ""
+    for span in name_div.find_all("span"):
+        own_text = "".join(span.find_all(string=True, recursive=False))
+        if "@" in own_text:
+            return span.get_text().replace("@", "").strip()
+    return ""
+
+
+def _tweet_text_from_soup(article):
+    tweet_div = article.find("div", attrs={"data-testid": "tweetText"})
+    if not tweet_div:
+        return ""
+    parts = []
+    for node in tweet_div.descendants:
+        if isinstance(node, NavigableString):
+            parts.append(str(node))
+        elif node.name == "img" and node.get("alt"):
+            parts.append(node["alt"])
+    return "".join(parts).strip()
+
+
+def parse_detail_page_html(html, tweet_url, extract_target):
+    """
+    投稿詳細ページのHTMLスナップショットをオフラインで解析する。
+    extract_thread_from_detail_page（webdriver方式）と同じ形のdictを返すが、
+    articleはNone、poster画像はURL（video_poster_url）として返す。
+    WebDriverに触れないため別プロセスでも実行できる。
+    """
+    soup = BeautifulSoup(
+        html,
+        "html.parser",
+        parse_only=SoupStrainer("div", attrs={"data-testid": "cellInnerDiv"}),
+    )
 
     def get_transform_y(cell):
-        style = cell.get_attribute("style") or ""
-        m = re.search(r"translateY\(([\d\.]+)px\)", style)
+        m = re.search(r"translateY\(([\d\.]+)px\)", cell.get("style") or "")
         return float(m.group(1)) if m else 0
 
     tweet_blocks = []
+    thread_articles = []  # 自リプライ抽出用（「もっと見つける」より前の全article）
     current_id = re.sub(r"\D", "", tweet_url.split("/")[-1])
 
-    cell_divs = driver.find_elements(By.XPATH, "//div[@data-testid='cellInnerDiv']")
-    print(f"cellInnerDiv数: {len(cell_divs)}")
+    cell_divs = soup.find_all("div", attrs={"data-testid": "cellInnerDiv"})
+    log.debug("cellInnerDiv数: %s", len(cell_divs))
     cell_divs = sorted(cell_divs, key=get_transform_y)
 
     for cell in cell_divs:
-        texts = []
-        for tag in ["span", "h2"]:
-            for el in cell.find_elements(By.XPATH, f".//{tag}"):
-                t = (
-                    el.text.strip()
-                    .replace("\u200b", "")
-                    .replace("\n", "")
-                    .replace(" ", "")
-                )
-                if t:
-                    texts.append(t)
-        if any("もっと見つける" in t for t in texts):
-            print("🔝 もっと見つける以降の投稿を除外")
+        if any("もっと見つける" in t for t in _cleaned_texts(cell)):
+            log.debug("🔝 もっと見つける以降の投稿を除外")
             break
 
-        articles = cell.find_elements(By.XPATH, ".//article[@data-testid='tweet']")
+        articles = cell.find_all("article", attrs={"data-testid": "tweet"})
+        thread_articles.extend(articles)
         for i, article in enumerate(articles):
             try:
-                href_el = article.find_element(
-                    By.XPATH, ".//a[contains(@href, '/status/')]"
-                )
-                href = href_el.get_attribute("href")
+                href_el = article.find("a", href=re.compile(r"/status/"))
+                href = href_el.get("href") if href_el else ""
                 match = re.search(r"/status/(\d{10,})", href)
                 tweet_id = match.group(1) if match else None
-                print(f"🔎 [{i+1}] article探索: href={href} → tweet_id={tweet_id}")
+                log.debug(
+                    "🔎 [%s] article探索: href=%s → tweet_id=%s", i + 1, href, tweet_id
+                )
 
                 if not tweet_id:
-                    print(f"🛑 tweet_id抽出失敗 → 除外: href={href}")
+                    log.debug("🛑 tweet_id抽出失敗 → 除外: href=%s", href)
                     continue
 
-                try:
-                    tweet_div = article.find_element(
-                        By.XPATH, ".//div[@data-testid='tweetText']"
-                    )
-                    parts = []
-                    for elem in tweet_div.find_elements(By.XPATH, ".//*"):
-                        if elem.tag_name == "img" and elem.get_attribute("alt"):
-                            parts.append(elem.get_attribute("alt"))
-                        elif elem.text:
-                            parts.append(elem.text)
-                    text = "".join(parts).strip()
-                except:
-                    text = ""
+                text = _tweet_text_from_soup(article)
 
-                images = article.find_elements(
-                    By.XPATH, ".//img[contains(@src, 'twimg.com/media')]"
+                images_with_src = article.find_all(
+                    "img", src=re.compile(r"twimg\.com/media")
                 )
-                images_with_src = [img for img in images if img.get_attribute("src")]
-
-                video_srcs = [
-                    v.get_attribute("src")
-                    for v in article.find_elements(By.XPATH, ".//video")
-                    if v.get_attribute("src")
-                ]
-
-                has_video_tag = bool(article.find_elements(By.XPATH, ".//video"))
-                has_media = bool(images_with_src or video_srcs or has_video_tag)
-
-                if not has_media:
-                    for src in video_srcs:
-                        if src.startswith("blob:"):
-                            has_media = True
-                            break
+                has_video_tag = bool(article.find("video"))
+                has_media = bool(images_with_src or has_video_tag)
 
-                if is_reply_structure(
-                    article, tweet_id=tweet_id, text=text, has_media=has_media
+                probes = {
+                    "reply_aria": lambda: bool(
+                        article.find(
+                            "div", attrs={"aria-labelledby": re.compile("rxyo3tk")}
+                        )
+                    ),
+                    "reply_text": lambda: bool(
+                        article.find(string=re.compile("返信先"))
+                    ),
+                    "button_count": lambda: len(
+                        article.select("div[role='group'] button")
+                    ),
+                    "quote_text": lambda: bool(article.find(string=re.compile("引用"))),
+                }
+                if judge_reply_structure(
+                    lambda name: probes[name](),
+                    tweet_id=tweet_id,
+                    text=text,
+                    has_media=has_media,
                 ):
                     continue
 
-                time_els = article.find_elements(By.XPATH, ".//time")
-                date_str = time_els[0].get_attribute("datetime") if time_els else None
+                time_el = article.find("time")
+                date_str = time_el.get("datetime") if time_el else None
                 if not date_str:
-                    print(f"⚠️ 投稿日時なし → date=None に設定: ID={tweet_id}")
+                    log.debug("⚠️ 投稿日時なし → date=None に設定: ID=%s", tweet_id)
 
-                username = ""
-                try:
-                    username_el = article.find_element(
+                tweet_blocks.append(
+                    {
+                        "article": article,
+                        "text": text,
+                        "date": date_str,
+                        "id": tweet_id,
+                        "username": _find_handle(article),
+                    }
+                )
+
+            except Exception as e:
+                log.warning("⚠️ article解析エラー: %s - %s", type(e).__name__, str(e))
+                continue
+
+    log.debug("🔍 アクセス元URL: %s", tweet_url)
+    log.debug("🔢 アクセス元ID: %s", current_id)
+
+    if not tweet_blocks:
+        log.warning("⚠️ 有効な投稿ブロックがないためスキップ")
+        return []
+
+    tweet_blocks.sort(key=lambda x: int(x["id"]))
+    if log.isEnabledFor(logging.DEBUG):
+        for i, block in enumerate(tweet_blocks):
+            log.debug(
+                "  [%s] DOM取得ID: %s | text先頭: %s",
+                i + 1,
+                block["id"],
+                block["text"].replace(chr(10), " ")[:15],
+            )
+
+    valid_blocks = [
+        b
+        for b in tweet_blocks
+        if b.get("username") == extract_target and not is_ad_post(b["text"])
+    ]
+    if not valid_blocks:
+        log.warning("⚠️ 有効な投稿者一致+非広告の投稿が見つかりません → 除外")
+        return []
+
+    parent_id = valid_blocks[0]["id"]
+    if current_id != parent_id:
+        log.info(
+            "🔝 投稿ID %s は親ID %s ではないため除外（投稿者一致+非広告で判定）",
+            current_id,
+            parent_id,
+        )
+        return []
+
+    block = next(b for b in tweet_blocks if b["id"] == current_id)
+    parent_article = block["article"]
+
+    # --- 親投稿のvideoタグだけを抽出（引用元のvideoを除外） ---
+    parent_videos = [
+        v
+        for v in parent_article.find_all("video")
+        if _belongs_only_to(v, parent_article)
+    ]
+    log.debug(
+        "🟦 スクショ対象articleのID: %s | videoタグ数: %s",
+        block["id"],
+        len(parent_videos),
+    )
+    for idx, v in enumerate(parent_videos):
+        log.debug(
+            "　└ parent_video[%s] src=%s poster=%s", idx, v.get("src"), v.get("poster")
+        )
+
+    poster_url = parent_videos[0].get("poster") if parent_videos else None
+    if not parent_videos:
+        log.debug("🟥 poster属性付きvideoタグなし")
+
+    # --- 親投稿の画像だけを抽出（twimg.com/media画像＋質問箱/card_img画像） ---
+    image_urls = [
+        img["src"]
+        for img in parent_article.find_all(
+            "img", src=re.compile(r"twimg\.com/(media|card_img)")
+        )
+        if _belongs_only_to(img, parent_article)
+    ]
+
+    metric_labels = [
+        div["aria-label"]
+        for div in parent_article.find_all(
+            "div", attrs={"aria-label": METRIC_GROUP_LABEL_RE}
+        )
+    ] + [
+        btn["aria-label"]
+        for btn in parent_article.find_all(
+            "button", attrs={"data-testid": METRIC_BUTTON_TESTIDS}
+        )
+        if btn.get("aria-label")
+    ]
+    impressions, retweets, likes, bookmarks, replies = parse_metrics_labels(
+        metric_labels
+    )
+
+    return [
+        {
+            "url": tweet_url,
+            "id": current_id,
+            "text": block["text"],
+            "date": block["date"],
+            "images": image_urls,
+            "username": block["username"],
+            "impressions": impressions,
+            "retweets": retweets,
+            "likes": likes,
+            "bookmarks": bookmarks,
+            "replies": replies,
+            "article": None,
+            "video_poster_url": poster_url,
+            "self_replies": [
+                reply
+                for reply in (
+                    self_reply_from_soup(a, block["username"]) for a in thread_articles
+                )
+                if reply
+            ],
+        }
+    ]
+
+
+def get_detail_parse_pool():
+    global detail_parse_pool
+    with detail_parse_pool_lock:
+        if detail_parse_pool is None:
+            detail_parse_pool = ProcessPoolExecutor(
+                max_workers=max(1, DETAIL_WORKERS),
+                initializer=init_worker_logging,
+                initargs=worker_logging_args(),
+            )
+        return detail_parse_pool
+
+
+def shutdown_detail_parse_pool():
+    global detail_parse_pool
+    with detail_parse_pool_lock:
+        pool, detail_parse_pool = detail_parse_pool, None
+    if pool is not None:
+        pool.shutdown()
+
+
+@instrumented("extract_thread_from_detail_page")
+def extract_thread_from_detail_page(driver, tweet_url):
+    """
+    投稿詳細ページから [親投稿] を返す。対象外の投稿なら []、ページを読み込めなければ None
+    """
+    if DETAIL_PARSER == "html":
+        html = capture_detail_page_html(driver, tweet_url)
+        if html is None:
+            return None
+        return finalize_detail_thread(
+            parse_detail_page_html(html, tweet_url, current_target())
+        )
+    thread = extract_thread_with_webdriver(driver, tweet_url)
+    return None if thread is None else finalize_detail_thread(thread)
+
+
+def extract_thread_with_webdriver(driver, tweet_url):
+    if not open_detail_page(driver, tweet_url):
+        return None
+
+    def get_transform_y(cell):
+        style = cell.get_attribute("style") or ""
+        m = re.search(r"translateY\(([\d\.]+)px\)", style)
+        return float(m.group(1)) if m else 0
+
+    tweet_blocks = []
+    thread_articles = []  # 自リプライ抽出用（「もっと見つける」より前の全article）
+    current_id = re.sub(r"\D", "", tweet_url.split("/")[-1])
+
+    cell_divs = driver.find_elements(By.XPATH, "//div[@data-testid='cellInnerDiv']")
+    log.debug("cellInnerDiv数: %s", len(cell_divs))
+    cell_divs = sorted(cell_divs, key=get_transform_y)
+
+    for cell in cell_divs:
+        texts = []
+        for tag in ["span", "h2"]:
+            for el in cell.find_elements(By.XPATH, f".//{tag}"):
+                t = (
+                    el.text.strip()
+                    .replace("\u200b", "")
+                    .replace("\n", "")
+                    .replace(" ", "")
+                )
+                if t:
+                    texts.append(t)
+        if any("もっと見つける" in t for t in texts):
+            log.debug("🔝 もっと見つける以降の投稿を除外")
+            break
+
+        articles = cell.find_elements(By.XPATH, ".//article[@data-testid='tweet']")
+        thread_articles.extend(articles)
+        for i, article in enumerate(articles):
+            try:
+                href_el = article.find_element(
+                    By.XPATH, ".//a[contains(@href, '/status/')]"
+                )
+                href = href_el.get_attribute("href")
+                match = re.search(r"/status/(\d{10,})", href)
+                tweet_id = match.group(1) if match else None
+                log.debug(
+                    "🔎 [%s] article探索: href=%s → tweet_id=%s", i + 1, href, tweet_id
+                )
+
+                if not tweet_id:
+                    log.debug("🛑 tweet_id抽出失敗 → 除外: href=%s", href)
+                    continue
+
+                try:
+                    tweet_div = article.find_element(
+                        By.XPATH, ".//div[@data-testid='tweetText']"
+                    )
+                    parts = []
+                    for elem in tweet_div.find_elements(By.XPATH, ".//*"):
+                        if elem.tag_name == "img" and elem.get_attribute("alt"):
+                            parts.append(elem.get_attribute("alt"))
+                        elif elem.text:
+                            parts.append(elem.text)
+                    text = "".join(parts).strip()
+                except:
+                    text = ""
+
+                images = article.find_elements(
+                    By.XPATH, ".//img[contains(@src, 'twimg.com/media')]"
+                )
+                images_with_src = [img for img in images if img.get_attribute("src")]
+
+                video_srcs = [
+                    v.get_attribute("src")
+                    for v in article.find_elements(By.XPATH, ".//video")
+                    if v.get_attribute("src")
+                ]
+
+                has_video_tag = bool(article.find_elements(By.XPATH, ".//video"))
+                has_media = bool(images_with_src or video_srcs or has_video_tag)
+
+                if not has_media:
+                    for src in video_srcs:
+                        if src.startswith("blob:"):
+                            has_media = True
+                            break
+
+                if is_reply_structure(
+                    article, tweet_id=tweet_id, text=text, has_media=has_media
+                ):
+                    continue
+
+                time_els = article.find_elements(By.XPATH, ".//time")
+                date_str = time_els[0].get_attribute("datetime") if time_els else None
+                if not date_str:
+                    log.debug("⚠️ 投稿日時なし → date=None に設定: ID=%s", tweet_id)
+
+                username = ""
+                try:
+                    username_el = article.find_element(
                         By.XPATH,
                         ".//div[@data-testid='User-Name']//span[contains(text(), '@')]",
                     )
@@ -345,35 +1309,41 @@ def extract_thread_from_detail_page(driver, tweet_url):
                 )
 
             except Exception as e:
-                print(f"⚠️ article解析エラー: {type(e).__name__} - {str(e)}")
+                log.warning("⚠️ article解析エラー: %s - %s", type(e).__name__, str(e))
                 continue
 
-    print(f"\n🔍 アクセス元URL: {tweet_url}")
-    print(f"🔢 アクセス元ID: {current_id}")
+    log.debug("🔍 アクセス元URL: %s", tweet_url)
+    log.debug("🔢 アクセス元ID: %s", current_id)
 
     if not tweet_blocks:
-        print("⚠️ 有効な投稿ブロックがないためスキップ")
+        log.warning("⚠️ 有効な投稿ブロックがないためスキップ")
         return []
 
     tweet_blocks.sort(key=lambda x: int(x["id"]))
-    for i, block in enumerate(tweet_blocks):
-        print(
-            f"  [{i+1}] DOM取得ID: {block['id']} | text先頭: {block['text'].replace(chr(10), ' ')[:15]}"
-        )
+    if log.isEnabledFor(logging.DEBUG):
+        for i, block in enumerate(tweet_blocks):
+            log.debug(
+                "  [%s] DOM取得ID: %s | text先頭: %s",
+                i + 1,
+                block["id"],
+                block["text"].replace(chr(10), " ")[:15],
+            )
 
     valid_blocks = [
         b
         for b in tweet_blocks
-        if b.get("username") == EXTRACT_TARGET and not is_ad_post(b["text"])
+        if b.get("username") == current_target() and not is_ad_post(b["text"])
     ]
     if not valid_blocks:
-        print("⚠️ 有効な投稿者一致+非広告の投稿が見つかりません → 除外")
+        log.warning("⚠️ 有効な投稿者一致+非広告の投稿が見つかりません → 除外")
         return []
 
     parent_id = sorted(valid_blocks, key=lambda x: int(x["id"]))[0]["id"]
     if current_id != parent_id:
-        print(
-            f"🔝 投稿ID {current_id} は親ID {parent_id} ではないため除外（投稿者一致+非広告で判定）"
+        log.info(
+            "🔝 投稿ID %s は親ID %s ではないため除外（投稿者一致+非広告で判定）",
+            current_id,
+            parent_id,
         )
         return []
 
@@ -400,31 +1370,23 @@ def extract_thread_from_detail_page(driver, tweet_url):
         == 1
     ]
 
-    print(
-        f"🟦 スクショ対象articleのID: {block['id']} | videoタグ数: {len(parent_videos)}"
+    log.debug(
+        "🟦 スクショ対象articleのID: %s | videoタグ数: %s",
+        block["id"],
+        len(parent_videos),
     )
-    for idx, v in enumerate(parent_videos):
-        src = v.get_attribute("src")
-        poster = v.get_attribute("poster")
-        print(f"　└ parent_video[{idx}] src={src} poster={poster}")
-
-    poster_path = None
+    # src/poster の取得はWebDriver往復になるため、DEBUG出力時のみ行う
+    if log.isEnabledFor(logging.DEBUG):
+        for idx, v in enumerate(parent_videos):
+            src = v.get_attribute("src")
+            poster = v.get_attribute("poster")
+            log.debug("　└ parent_video[%s] src=%s poster=%s", idx, src, poster)
+
+    poster_url = None
     if parent_videos:
         poster_url = parent_videos[0].get_attribute("poster")
-        if poster_url:
-            print(f"🟦 poster画像URL: {poster_url}")
-            # poster画像をダウンロードして保存
-            poster_path = f"video_poster_{current_id}.jpg"
-            try:
-                resp = requests.get(poster_url, stream=True)
-                with open(poster_path, "wb") as f:
-                    for chunk in resp.iter_content(1024):
-                        f.write(chunk)
-                print(f"🟩 poster画像保存: {poster_path}")
-            except Exception as e:
-                print(f"❌ poster画像保存失敗: {e}")
     else:
-        print("🟥 poster属性付きvideoタグなし")
+        log.debug("🟥 poster属性付きvideoタグなし")
 
     # --- 親投稿の画像だけを抽出（twimg.com/media画像＋質問箱/card_img画像） ---
     image_urls = [
@@ -456,261 +1418,436 @@ def extract_thread_from_detail_page(driver, tweet_url):
             "bookmarks": bookmarks,
             "replies": replies,
             "article": block["article"],
-            "video_poster": poster_path,
+            "video_poster_url": poster_url,
+            "self_replies": [
+                reply
+                for reply in (
+                    self_reply_from_article(a, block["username"])
+                    for a in thread_articles
+                )
+                if reply
+            ],
         }
     ]
 
 
+def setup_detail_drivers(driver, count, target=None, index_offset=0):
+    """
+    メインのdriverに加えて count-1 台のブラウザを起動し、login() でCookieを注入する
+    index_offset: ユーザーデータディレクトリの番号をずらす（対象ワーカーごとに重ならないように）
+    """
+    drivers = [driver]
+    for n in range(1, count):
+        log.info("🧭 詳細ページ用ブラウザ起動中… (%s/%s)", n + 1, count)
+        try:
+            extra = setup_driver(worker_index=index_offset + n)
+            login(extra, target)
+            drivers.append(extra)
+        except Exception as e:
+            log.warning(
+                "⚠️ 詳細ページ用ブラウザ起動失敗 → %s台で継続: %s", len(drivers), e
+            )
+            break
+    return drivers
+
+
+def quit_detail_drivers(driver):
+    for extra in current_detail_drivers():
+        if extra is driver:
+            continue
+        try:
+            extra.quit()
+        except Exception as e:
+            log.warning("⚠️ 詳細ページ用ブラウザ終了失敗: %s", e)
+
+
+def extract_threads_parallel(drivers, tweet_urls, max_tweets, target=None):
+    """
+    共有キューからURLを取り出し、各ブラウザで extract_thread_from_detail_page を実行する。
+    ワーカースレッドはスレッドローカルの対象アカウントを引き継がないため、target で明示的に渡す。
+    未登録の有効IDが max_tweets 件集まった時点で新規の取り出しを止める。
+    キューはURL順に取り出されるため、止めた時点で処理済みのURLは常に先頭からの連続区間になり、
+    URL順に並べ直した結果は1台で順に処理した場合と同じ投稿を含む。
+    """
+    if target is None:
+        target = current_target()
+    work = queue.Queue()
+    for idx, meta in enumerate(tweet_urls):
+        work.put((idx, meta["url"] if isinstance(meta, dict) else meta))
+
+    results = {}
+    found_ids = set()
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    def worker(drv):
+        worker_state.extract_target = target
+        while not stop.is_set():
+            try:
+                idx, tweet_url = work.get_nowait()
+            except queue.Empty:
+                return
+            log.info("🧪 処理中: %s", tweet_url)
+            try:
+                if DETAIL_PARSER == "html":
+                    html = capture_detail_page_html(drv, tweet_url)
+                    thread = None
+                    if html is not None:
+                        thread = finalize_detail_thread(
+                            get_detail_parse_pool()
+                            .submit(
+                                parse_detail_page_html,
+                                html,
+                                tweet_url,
+                                target,
+                            )
+                            .result()
+                        )
+                else:
+                    thread = extract_thread_from_detail_page(drv, tweet_url)
+                # 読み込めなかったページは記録せず、再開時に訪問し直す
+                if thread is None:
+                    note_detail_failure(tweet_url)
+                else:
+                    journal_thread(tweet_url, thread)
+            except Exception as e:
+                log.warning("⚠️ スレッド処理エラー: %s", e)
+                note_detail_failure(tweet_url)
+                thread = None
+            thread = thread or []
+
+            with lock:
+                results[idx] = thread
+                tweet_id = thread[0].get("id") if thread else None
+                if tweet_id and not already_registered(tweet_id):
+                    found_ids.add(tweet_id)
+                if len(found_ids) >= max_tweets:
+                    stop.set()
+
+    workers = [threading.Thread(target=worker, args=(drv,)) for drv in drivers]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    return [results[idx] for idx in sorted(results)]
+
+
 def extract_and_merge_tweets(driver, tweet_urls, max_tweets):
     tweets = []
     seen_ids = set()
     registered_count = 0  # ✅ 実際に登録対象として成功した件数をカウント
 
+    def accept(thread):
+        nonlocal registered_count
+        if not thread:
+            return
+
+        post = thread[0]  # ✅ 常に1投稿のみ対象とする
+        tweet_id = post.get("id")
+
+        if not tweet_id or tweet_id in seen_ids:
+            log.warning("⚠️ 重複または無効ID → スキップ: %s", tweet_id)
+            return
+        if already_registered(tweet_id):
+            log.info("🚫 登録済み → スキップ: %s", tweet_id)
+            return
+
+        tweets.append(post)
+        seen_ids.add(tweet_id)
+        registered_count += 1
+        log.info(
+            "✅ 登録対象として追加: %s（現在 %s/%s 件）",
+            tweet_id,
+            registered_count,
+            max_tweets,
+        )
+
+    def collect(tweet_url, future):
+        try:
+            thread = finalize_detail_thread(future.result())
+            journal_thread(tweet_url, thread)
+            accept(thread)
+        except Exception as e:
+            log.warning("⚠️ スレッド処理エラー: %s", e)
+            note_detail_failure(tweet_url)
+
+    # 再開時: ジャーナルに記録済みのURLは詳細ページを開かずに前回の結果を使う
+    if crawl_journal is not None:
+        remaining_urls = []
+        for meta in tweet_urls:
+            tweet_url = meta["url"] if isinstance(meta, dict) else meta
+            thread = crawl_journal.load_thread(tweet_url)
+            if thread is None:
+                remaining_urls.append(meta)
+            elif registered_count < max_tweets:
+                accept(thread)
+        if len(remaining_urls) < len(tweet_urls):
+            log.info(
+                "⏯️ ジャーナルから %s 件の詳細を復元",
+                len(tweet_urls) - len(remaining_urls),
+            )
+        tweet_urls = remaining_urls
+
+    drivers = current_detail_drivers()
+    if len(drivers) > 1:
+        log.info("🧭 %s台のブラウザで詳細ページを並列処理", len(drivers))
+        for thread in extract_threads_parallel(
+            drivers, tweet_urls, max_tweets, current_target()
+        ):
+            if registered_count >= max_tweets:
+                log.info("🎯 登録件数が MAX_TWEETS に達したため終了")
+                break
+            accept(thread)
+        tweets.sort(key=lambda x: int(x["id"]))
+        log.info("📈 完了: %s 件の投稿を抽出（登録対象として）", len(tweets))
+        return tweets
+
+    # html方式では解析を別プロセスに回し、その間にブラウザは次のURLを読み込む
+    pending = None
     for i, meta in enumerate(tweet_urls):
         if registered_count >= max_tweets:
-            print("🎯 登録件数が MAX_TWEETS に達したため終了")
+            log.info("🎯 登録件数が MAX_TWEETS に達したため終了")
             break
 
         tweet_url = meta["url"] if isinstance(meta, dict) else meta
-        print(f"\n🧪 処理中: {tweet_url}")
+        log.info("🧪 処理中: %s", tweet_url)
 
         try:
-            thread = extract_thread_from_detail_page(driver, tweet_url)
-            if not thread:
-                continue
-
-            post = thread[0]  # ✅ 常に1投稿のみ対象とする
-            tweet_id = post.get("id")
-
-            if not tweet_id or tweet_id in seen_ids:
-                print(f"⚠️ 重複または無効ID → スキップ: {tweet_id}")
-                continue
-            if already_registered(tweet_id):
-                print(f"🚫 登録済み → スキップ: {tweet_id}")
-                continue
-
-            tweets.append(post)
-            seen_ids.add(tweet_id)
-            registered_count += 1
-            print(
-                f"✅ 登録対象として追加: {tweet_id}（現在 {registered_count}/{max_tweets} 件）"
-            )
+            if DETAIL_PARSER == "html":
+                html = capture_detail_page_html(driver, tweet_url)
+                future = None
+                if html is not None:
+                    future = get_detail_parse_pool().submit(
+                        parse_detail_page_html, html, tweet_url, current_target()
+                    )
+                else:
+                    note_detail_failure(tweet_url)
+                if pending is not None:
+                    collect(*pending)
+                pending = (tweet_url, future) if future is not None else None
+            else:
+                # 読み込めなかったページは記録せず、再開時に訪問し直す
+                thread = extract_thread_from_detail_page(driver, tweet_url)
+                if thread is not None:
+                    journal_thread(tweet_url, thread)
+                else:
+                    note_detail_failure(tweet_url)
+                accept(thread)
 
         except Exception as e:
-            print(f"⚠️ スレッド処理エラー: {e}")
+            log.warning("⚠️ スレッド処理エラー: %s", e)
+            note_detail_failure(tweet_url)
             continue
 
-    print(f"\n📈 完了: {len(tweets)} 件の投稿を抽出（登録対象として）")
+    if pending is not None and registered_count < max_tweets:
+        collect(*pending)
+
+    tweets.sort(key=lambda x: int(x["id"]))
+    log.info("📈 完了: %s 件の投稿を抽出（登録対象として）", len(tweets))
     return tweets
 
 
+# aria-label 中の「数値＋単位＋指標名」を1回の走査で拾う（日本語/英語UI両対応）
+METRIC_LABEL_RE = re.compile(
+    r"(?P<num>\d[\d,]*(?:\.\d+)?)\s*(?P<unit>万|億|[KM](?![a-z]))?\s*(?:件の)?\s*"
+    r"(?P<kind>返信|リポスト|いいね|ブックマーク|表示"
+    r"|repl(?:y|ies)|reposts?|retweets?|likes?|bookmarks?|views?)",
+    re.IGNORECASE,
+)
+METRIC_KINDS = {
+    "返信": "replies",
+    "reply": "replies",
+    "replies": "replies",
+    "リポスト": "retweets",
+    "repost": "retweets",
+    "reposts": "retweets",
+    "retweet": "retweets",
+    "retweets": "retweets",
+    "いいね": "likes",
+    "like": "likes",
+    "likes": "likes",
+    "ブックマーク": "bookmarks",
+    "bookmark": "bookmarks",
+    "bookmarks": "bookmarks",
+    "表示": "impressions",
+    "view": "impressions",
+    "views": "impressions",
+}
+METRIC_UNITS = {"万": 10_000, "億": 100_000_000, "k": 1_000, "m": 1_000_000}
+METRIC_FIELDS = ("impressions", "retweets", "likes", "bookmarks", "replies")
+METRIC_GROUP_LABEL_RE = re.compile(r"件の表示|views?\b", re.IGNORECASE)
+METRIC_BUTTON_TESTIDS = (
+    "reply",
+    "retweet",
+    "unretweet",
+    "like",
+    "unlike",
+    "bookmark",
+    "removeBookmark",
+)
+
+# 指標のaria-label（グループdiv → ボタンの順）を1回の execute_script でまとめて取得
+METRIC_LABELS_JS = """
+const article = arguments[0];
+const testids = arguments[1];
+const groups = Array.from(article.querySelectorAll("div[aria-label]"))
+  .map((div) => div.getAttribute("aria-label"))
+  .filter((label) => /件の表示|views?\\b/i.test(label));
+const buttons = Array.from(article.querySelectorAll("button[data-testid]"))
+  .filter((btn) => testids.includes(btn.getAttribute("data-testid")))
+  .map((btn) => btn.getAttribute("aria-label"))
+  .filter((label) => label);
+return groups.concat(buttons);
+"""
+
+
+def parse_metric_number(num, unit=None):
+    """「1,234」「1.2万」「3億」「5.6K」「1.2M」を整数にする"""
+    value = float(num.replace(",", ""))
+    if unit:
+        value *= METRIC_UNITS[unit.lower()]
+    return int(round(value))
+
+
+def parse_metrics_label(label):
+    """1つのaria-labelから {指標名: 数値} を返す（含まれない指標はキーなし）"""
+    found = {}
+    for m in METRIC_LABEL_RE.finditer(label or ""):
+        field = METRIC_KINDS[m.group("kind").lower()]
+        if field not in found:
+            found[field] = parse_metric_number(m.group("num"), m.group("unit"))
+    return found
+
+
+def parse_metrics_labels(labels):
+    """
+    aria-label一覧（グループdiv → 各ボタンの順）から
+    (インプレッション, リポスト, いいね, ブックマーク, リプライ) を返す純粋関数。
+    先に出てきたラベルの値を優先し、取得できないものは0（インプレッションのみNone）。
+    表示数だけのラベルしかない場合も他の指標は0になる。
+    """
+    metrics = {}
+    for label in labels:
+        for field, value in parse_metrics_label(label).items():
+            metrics.setdefault(field, value)
+        if len(metrics) == len(METRIC_FIELDS):
+            break
+    return (
+        metrics.get("impressions"),
+        metrics.get("retweets", 0),
+        metrics.get("likes", 0),
+        metrics.get("bookmarks", 0),
+        metrics.get("replies", 0),
+    )
+
+
 def extract_metrics(article):
     """
     いいね数・リポスト数・インプレッション数・ブックマーク数・リプライ数を抽出
     取得できないものは0（インプレッションのみNone）で返す
     """
-    impressions = retweets = likes = bookmarks = replies = None
     try:
-        divs = article.find_elements(
-            By.XPATH, ".//div[contains(@aria-label, '件の表示')]"
+        labels = article.parent.execute_script(
+            METRIC_LABELS_JS, article, list(METRIC_BUTTON_TESTIDS)
         )
-        for div in divs:
-            label = div.get_attribute("aria-label")
-            print(f"🟦 aria-label内容: {label}")
-
-            # 1. 返信ありパターン
-            m_reply = re.search(
-                r"(\d[\d,\.万]*) 件の返信、(\d[\d,\.万]*) 件のリポスト、(\d[\d,\.万]*) 件のいいね、(\d[\d,\.万]*) 件のブックマーク、(\d[\d,\.万]*) 件の表示",
-                label or "",
-            )
-            if m_reply:
-                replies = m_reply.group(1)
-                retweets = m_reply.group(2)
-                likes = m_reply.group(3)
-                bookmarks = m_reply.group(4)
-                impressions = m_reply.group(5)
-                print(
-                    f"🟩 マッチ: 返信={replies}, RT={retweets}, いいね={likes}, BM={bookmarks}, 表示={impressions}"
-                )
-                break
+        metrics = parse_metrics_labels(labels or [])
+        log.debug("🟩 メトリクス: 表示=%s, RT=%s, いいね=%s, BM=%s, 返信=%s", *metrics)
+        return metrics
+    except Exception as e:
+        log.warning("⚠️ extract_metricsエラー: %s", e)
+        return None, None, None, None, None
+
 
-            # 2. ブックマークありパターン（返信なし）
-            m = re.search(
-                r"(\d[\d,\.万]*) 件のリポスト、(\d[\d,\.万]*) 件のいいね、(\d[\d,\.万]*) 件のブックマーク、(\d[\d,\.万]*) 件の表示",
-                label or "",
+def judge_reply_structure(probe, tweet_id=None, text="", has_media=False):
+    """
+    リプライ/引用構造の判定本体。
+    probe(name) は reply_aria / reply_text / button_count / quote_text を返す関数で、
+    WebElementへの問い合わせでも抽出済みdictの参照でもよい（必要な分だけ呼ばれる）。
+    """
+    # IDを表示用に設定
+    id_display = f"（ID={tweet_id}）" if tweet_id else ""
+    try:
+        # 1. 明示的な reply コンテナ構造
+        if probe("reply_aria"):
+            log.debug(
+                "🛑 is_reply_structure: aria-labelledby に 'rxyo3tk' 構造あり → リプライ判定 %s",
+                id_display,
             )
-            if m:
-                retweets = m.group(1)
-                likes = m.group(2)
-                bookmarks = m.group(3)
-                impressions = m.group(4)
-                print(
-                    f"🟩 マッチ: RT={retweets}, いいね={likes}, BM={bookmarks}, 表示={impressions}"
-                )
-                break
+            return True
 
-            # 3. ブックマークなしパターン
-            m2 = re.search(
-                r"(\d[\d,\.万]*) 件のリポスト、(\d[\d,\.万]*) 件のいいね、(\d[\d,\.万]*) 件の表示",
-                label or "",
+        # 2. 「返信先」の文言検出
+        if probe("reply_text"):
+            log.debug(
+                "🛑 is_reply_structure: '返信先' の文言を含む → リプライ判定 %s",
+                id_display,
             )
-            if m2:
-                retweets = m2.group(1)
-                likes = m2.group(2)
-                impressions = m2.group(3)
-                print(f"🟩 マッチ: RT={retweets}, いいね={likes}, 表示={impressions}")
-                break
+            return True
 
-            # 4. インプレッションのみパターン
-            m3 = re.search(r"([\d,\.万]+) 件の表示", label or "")
-            if m3:
-                impressions = m3.group(1)
-                print(f"🟦 インプレッションのみ: 表示={impressions}")
-                # likes/retweets/bookmarks/repliesは0扱い
-                retweets = 0
-                likes = 0
-                bookmarks = 0
-                replies = 0
-                break
+        # 3. アクションボタンの数が少ない → リプライや引用
+        button_count = probe("button_count") or 0
+        if button_count < 4:
+            log.debug(
+                "🛑 is_reply_structure: ボタン数 %s 個 → リプライ判定 %s",
+                button_count,
+                id_display,
+            )
+            return True
 
-        # いいね
-        if likes is None:
-            try:
-                like_btns = article.find_elements(
-                    By.XPATH, ".//button[@data-testid='like']"
+        # 4. 引用の場合（メディア付き & 50文字以上なら許可）
+        if probe("quote_text"):
+            text_length = len(text.strip()) if text else 0
+            if has_media and text_length >= 50:
+                log.debug(
+                    "✅ is_reply_structure: 引用あり（画像+50文字以上）→ 許可 %s",
+                    id_display,
                 )
-                for btn in like_btns:
-                    label = btn.get_attribute("aria-label")
-                    m = re.search(r"(\d[\d,\.万]*) 件のいいね", label or "")
-                    if m:
-                        likes = m.group(1)
-                        print(f"🟦 ボタンからいいね数取得: {likes}")
-                        break
-            except Exception as e:
-                print(f"⚠️ いいね数抽出エラー: {e}")
+                return False
+            log.debug(
+                "🛑 is_reply_structure: 引用あり（条件未満）→ 除外 %s | 長さ=%s | メディアあり=%s",
+                id_display,
+                text_length,
+                has_media,
+            )
+            return True
 
-        # リポスト
-        if retweets is None:
-            try:
-                rt_btns = article.find_elements(
-                    By.XPATH, ".//button[@data-testid='retweet']"
-                )
-                for btn in rt_btns:
-                    label = btn.get_attribute("aria-label")
-                    m = re.search(r"(\d[\d,\.万]*) 件のリポスト", label or "")
-                    if m:
-                        retweets = m.group(1)
-                        print(f"🟦 ボタンからリポスト数取得: {retweets}")
-                        break
-            except Exception as e:
-                print(f"⚠️ リポスト数抽出エラー: {e}")
-
-        # ブックマーク
-        if bookmarks is None:
-            try:
-                bm_btns = article.find_elements(
-                    By.XPATH, ".//button[@data-testid='bookmark']"
-                )
-                for btn in bm_btns:
-                    label = btn.get_attribute("aria-label")
-                    m = re.search(r"(\d[\d,\.万]*) 件のブックマーク", label or "")
-                    if m:
-                        bookmarks = m.group(1)
-                        print(f"🟦 ボタンからブックマーク数取得: {bookmarks}")
-                        break
-            except Exception as e:
-                print(f"⚠️ ブックマーク数抽出エラー: {e}")
-
-        # リプライ
-        if replies is None:
-            try:
-                reply_btns = article.find_elements(
-                    By.XPATH, ".//button[@data-testid='reply']"
-                )
-                for btn in reply_btns:
-                    label = btn.get_attribute("aria-label")
-                    m = re.search(r"(\d[\d,\.万]*) 件の返信", label or "")
-                    if m:
-                        replies = m.group(1)
-                        print(f"🟦 ボタンからリプライ数取得: {replies}")
-                        break
-            except Exception as e:
-                print(f"⚠️ リプライ数抽出エラー: {e}")
-
-        def parse_num(s):
-            if not s:
-                return 0
-            s = s.replace(",", "")
-            if "万" in s:
-                return int(float(s.replace("万", "")) * 10000)
-            try:
-                return int(s)
-            except:
-                return 0
-
-        impressions = parse_num(impressions) if impressions is not None else None
-        retweets = parse_num(retweets)
-        likes = parse_num(likes)
-        bookmarks = parse_num(bookmarks)
-        replies = parse_num(replies)
+        # 5. 上記に該当しない → 親投稿と判断
+        log.debug("✅ is_reply_structure: 構造上問題なし → 親投稿と判定 %s", id_display)
+        return False
 
     except Exception as e:
-        print(f"⚠️ extract_metricsエラー: {e}")
-    return impressions, retweets, likes, bookmarks, replies
+        log.warning("⚠️ is_reply_structure: 判定エラー %s → %s", id_display, e)
+        return False
 
 
 def is_reply_structure(article, tweet_id=None, text="", has_media=False):
-    try:
-        # IDを表示用に設定
-        id_display = f"（ID={tweet_id}）" if tweet_id else ""
-
-        # 1. 明示的な reply コンテナ構造
-        reply_aria = article.find_elements(
-            By.XPATH, ".//div[contains(@aria-labelledby, 'rxyo3tk')]"
-        )
-        if reply_aria:
-            print(
-                f"🛑 is_reply_structure: aria-labelledby に 'rxyo3tk' 構造あり → リプライ判定 {id_display}"
-            )
-            return True
-
-        # 2. 「返信先」の文言検出
-        reply_text = article.find_elements(By.XPATH, ".//*[contains(text(), '返信先')]")
-        if reply_text:
-            print(
-                f"🛑 is_reply_structure: '返信先' の文言を含む → リプライ判定 {id_display}"
-            )
-            return True
-
-        # 3. アクションボタンの数が少ない → リプライや引用
-        buttons = article.find_elements(By.XPATH, ".//div[@role='group']//button")
-        if len(buttons) < 4:
-            print(
-                f"🛑 is_reply_structure: ボタン数 {len(buttons)} 個 → リプライ判定 {id_display}"
-            )
-            return True
-
-        # 4. 引用の場合（メディア付き & 50文字以上なら許可）
-        quote_text = article.find_elements(By.XPATH, ".//*[contains(text(), '引用')]")
-        if quote_text:
-            text_length = len(text.strip()) if text else 0
-            if has_media and text_length >= 50:
-                print(
-                    f"✅ is_reply_structure: 引用あり（画像+50文字以上）→ 許可 {id_display}"
-                )
-                return False
-            print(
-                f"🛑 is_reply_structure: 引用あり（条件未満）→ 除外 {id_display} | 長さ={text_length} | メディアあり={has_media}"
+    probes = {
+        "reply_aria": lambda: bool(
+            article.find_elements(
+                By.XPATH, ".//div[contains(@aria-labelledby, 'rxyo3tk')]"
             )
-            return True
+        ),
+        "reply_text": lambda: bool(
+            article.find_elements(By.XPATH, ".//*[contains(text(), '返信先')]")
+        ),
+        "button_count": lambda: len(
+            article.find_elements(By.XPATH, ".//div[@role='group']//button")
+        ),
+        "quote_text": lambda: bool(
+            article.find_elements(By.XPATH, ".//*[contains(text(), '引用')]")
+        ),
+    }
+    return judge_reply_structure(
+        lambda name: probes[name](), tweet_id=tweet_id, text=text, has_media=has_media
+    )
 
-        # 5. 上記に該当しない → 親投稿と判断
-        print(f"✅ is_reply_structure: 構造上問題なし → 親投稿と判定 {id_display}")
-        return False
 
-    except Exception as e:
-        print(f"⚠️ is_reply_structure: 判定エラー {id_display} → {e}")
-        return False
+def is_reply_structure_data(info, tweet_id=None, text="", has_media=False):
+    """
+    EXTRACT_ARTICLES_JS で取得済みのdictに対して is_reply_structure と同じ判定を行う
+    """
+    return judge_reply_structure(
+        info.get, tweet_id=tweet_id, text=text, has_media=has_media
+    )
 
 
 def has_media_in_html(article_html):
@@ -728,8 +1865,86 @@ def has_media_in_html(article_html):
     return False
 
 
-def extract_tweets(driver, extract_target, max_tweets):
-    print(f"\n✨ アクセス中: https://twitter.com/{extract_target}")
+# extract_tweets の抽出方式: "js"（1スクロール1回のexecute_script）/ "webdriver"（従来方式）
+TIMELINE_ENGINE = "js"
+
+# 表示中の全articleを1回のexecute_scriptでまとめて取得する
+EXTRACT_ARTICLES_JS = r"""
+const hasText = (root, word) => {
+  const walker = document.createTreeWalker(root, NodeFilter.SHOW_TEXT);
+  while (walker.nextNode()) {
+    if (walker.currentNode.nodeValue.includes(word)) return true;
+  }
+  return false;
+};
+const ownText = (el) =>
+  Array.from(el.childNodes)
+    .filter((n) => n.nodeType === Node.TEXT_NODE)
+    .map((n) => n.nodeValue)
+    .join("");
+return Array.from(document.querySelectorAll("article[data-testid='tweet']")).map(
+  (article) => {
+    const link = article.querySelector("a[href*='/status/']");
+    const href = link ? link.href : null;
+    const idMatch = href ? href.match(/\/status\/(\d+)/) : null;
+    const textEl = article.querySelector("div[data-testid='tweetText']");
+    const handleEl = Array.from(
+      article.querySelectorAll("div[data-testid='User-Name'] span")
+    ).find((span) => ownText(span).includes("@"));
+    return {
+      url: href,
+      id: idMatch ? idMatch[1] : null,
+      text: textEl ? textEl.innerText : null,
+      images: Array.from(
+        article.querySelectorAll("img[src*='twimg.com/media']")
+      ).map((img) => img.getAttribute("src")),
+      videos: Array.from(article.querySelectorAll("video"))
+        .map((v) => v.getAttribute("src"))
+        .filter((src) => src),
+      has_media_html: !!article.querySelector(
+        "div[data-testid='video-player-mini-ui-'], button[aria-label='動画を再生'], video"
+      ),
+      reply_aria: !!article.querySelector("div[aria-labelledby*='rxyo3tk']"),
+      reply_text: hasText(article, "返信先"),
+      quote_text: hasText(article, "引用"),
+      button_count: article.querySelectorAll("div[role='group'] button").length,
+      handle: handleEl ? handleEl.innerText.trim().replace("@", "") : "",
+    };
+  }
+);
+"""
+
+
+def extract_articles_data(driver):
+    """
+    表示中のarticleを1回のWebDriver呼び出しでdictのリストとして取得する
+    """
+    return driver.execute_script(EXTRACT_ARTICLES_JS) or []
+
+
+# アカウントごとの登録済み最大投稿ID（high-water mark）で差分クロールする
+INCREMENTAL_CRAWL = True
+HIGH_WATER_OVERLAP = 3  # 固定ツイート等のため、mark以下の投稿をこの件数までは読み飛ばす
+# タイムラインの走査が high-water mark（またはタイムラインの末尾）まで届いたか（アカウント名は小文字）
+timeline_scan_complete = {}
+# 詳細ページを読み込めなかった投稿URL（mark をその投稿より先に進めないために使う）
+failed_detail_urls = set()
+failed_detail_lock = threading.Lock()
+
+
+def note_detail_failure(tweet_url):
+    with failed_detail_lock:
+        failed_detail_urls.add(tweet_url)
+
+
+@instrumented("extract_tweets")
+def extract_tweets(driver, extract_target, max_tweets, high_water=None):
+    """
+    high_water 指定時は、本人の投稿で high_water 以下のIDが
+    HIGH_WATER_OVERLAP 件を超えた時点でスクロールを打ち切る。
+    mark が未設定なら、走査中に見つけた登録済みの本人投稿の最大IDを初期値にする
+    """
+    log.info("✨ アクセス中: https://twitter.com/%s", extract_target)
     driver.get(f"https://twitter.com/{extract_target}")
     WebDriverWait(driver, 10).until(
         EC.presence_of_element_located((By.XPATH, "//article"))
@@ -746,90 +1961,184 @@ def extract_tweets(driver, extract_target, max_tweets):
     pause_threshold = 3
     last_seen_count = 0
 
-    while scroll_count < max_scrolls and len(tweet_urls) < max_tweets:
-        print(f"\n🔍 スクロール {scroll_count + 1} 回目")
-        articles = driver.find_elements(By.XPATH, "//article[@data-testid='tweet']")
-        print(f"📄 現在のarticle数: {len(articles)}")
+    below_mark_count = 0
+    reached_mark = False
+    exhausted = False  # 新しい投稿が出なくなった（タイムラインの末尾まで読んだ）
+    registered_max = None  # 走査中に見つけた登録済みの本人投稿の最大ID（mark の初期値）
+    own_status_path = f"/{extract_target.lower()}/status/"
+
+    def at_or_below_mark(tweet_url, tweet_id):
+        """high-water mark 以下の本人投稿ならTrue（打ち切り判定も更新）"""
+        nonlocal below_mark_count, reached_mark
+        if high_water is None or not tweet_id.isdigit():
+            return False
+        if own_status_path not in tweet_url.lower() or int(tweet_id) > high_water:
+            return False
+        below_mark_count += 1
+        log.debug(
+            "⏹️ high-water mark 以下: %s（%s/%s）",
+            tweet_url,
+            below_mark_count,
+            HIGH_WATER_OVERLAP + 1,
+        )
+        if below_mark_count > HIGH_WATER_OVERLAP:
+            log.info("🏁 前回登録済みの最新投稿 %s に到達したため打ち切り", high_water)
+            reached_mark = True
+        return True
+
+    def add_candidate(tweet_url, tweet_id, text):
+        """広告・登録済みを除外して候補に追加。max_tweetsに達したらTrue"""
+        nonlocal registered_max
+        keyword = ad_keyword(text)
+        if keyword:
+            log.debug("🚫 広告と判定（%s）→スキップ: %s", keyword, tweet_url)
+            return False
 
-        for i, article in enumerate(articles):
-            try:
-                print(f"🔎 [{i+1}/{len(articles)}] 投稿チェック中...")
+        if already_registered(tweet_id):
+            log.debug("❌ 登録済→スキップ: %s", tweet_url)
+            if own_status_path in tweet_url.lower() and tweet_id.isdigit():
+                registered_max = max(registered_max or 0, int(tweet_id))
+            return False
 
-                # href取得を安全に
-                href_els = article.find_elements(
-                    By.XPATH, ".//a[contains(@href, '/status/')]"
-                )
-                if not href_els:
-                    print("⚠️ hrefが見つからないためスキップ")
+        tweet_urls.append({"url": tweet_url, "id": tweet_id})
+
+        log.info("✅ 抽出: %s", tweet_url)
+        return len(tweet_urls) >= max_tweets
+
+    while (
+        scroll_count < max_scrolls and len(tweet_urls) < max_tweets and not reached_mark
+    ):
+        log.debug("🔍 スクロール %s 回目", scroll_count + 1)
+
+        article_infos = None
+        if TIMELINE_ENGINE == "js":
+            try:
+                article_infos = extract_articles_data(driver)
+            except Exception as e:
+                log.warning("⚠️ JS一括抽出失敗 → WebDriver方式で継続: %s", e)
+
+        if article_infos is not None:
+            log.debug("📄 現在のarticle数: %s", len(article_infos))
+            for i, info in enumerate(article_infos):
+                log.debug("🔎 [%s/%s] 投稿チェック中...", i + 1, len(article_infos))
+                tweet_url = info.get("url")
+                if not tweet_url:
+                    log.debug("⚠️ hrefが見つからないためスキップ")
                     continue
-                href = href_els[0].get_attribute("href")
-                tweet_url = href if href.startswith("http") else f"https://x.com{href}"
-                tweet_id = re.sub(r"\D", "", tweet_url.split("/")[-1])
+                tweet_id = info.get("id") or re.sub(r"\D", "", tweet_url.split("/")[-1])
 
                 if tweet_url in seen_urls:
-                    print(f"🌀 既出URL(スキップ): {tweet_url}")
+                    log.debug("🌀 既出URL(スキップ): %s", tweet_url)
                     continue
                 seen_urls.add(tweet_url)
 
-                text_el = article.find_element(
-                    By.XPATH, ".//div[@data-testid='tweetText']"
+                if at_or_below_mark(tweet_url, tweet_id):
+                    if reached_mark:
+                        break
+                    continue
+
+                if info.get("text") is None:
+                    log.debug("⚠️ 本文要素が見つからないためスキップ")
+                    continue
+                text = normalize_text(info["text"])
+                has_media = bool(
+                    info.get("images")
+                    or info.get("videos")
+                    or info.get("has_media_html")
                 )
-                text = normalize_text(text_el.text) if text_el else ""
 
-                images = [
-                    img.get_attribute("src")
-                    for img in article.find_elements(
-                        By.XPATH, ".//img[contains(@src, 'twimg.com/media')]"
+                if is_reply_structure_data(
+                    info, tweet_id=tweet_id, text=text, has_media=has_media
+                ):
+                    log.debug("↪️ リプライまたは引用構造スキップ: %s", tweet_url)
+                    continue
+
+                if add_candidate(tweet_url, tweet_id, text):
+                    break
+        else:
+            articles = driver.find_elements(By.XPATH, "//article[@data-testid='tweet']")
+            log.debug("📄 現在のarticle数: %s", len(articles))
+
+            for i, article in enumerate(articles):
+                try:
+                    log.debug("🔎 [%s/%s] 投稿チェック中...", i + 1, len(articles))
+
+                    # href取得を安全に
+                    href_els = article.find_elements(
+                        By.XPATH, ".//a[contains(@href, '/status/')]"
                     )
-                ]
-                videos = [
-                    v.get_attribute("src")
-                    for v in article.find_elements(By.XPATH, ".//video")
-                    if v.get_attribute("src")
-                ]
-                has_media = bool(images or videos)
+                    if not href_els:
+                        log.debug("⚠️ hrefが見つからないためスキップ")
+                        continue
+                    href = href_els[0].get_attribute("href")
+                    tweet_url = (
+                        href if href.startswith("http") else f"https://x.com{href}"
+                    )
+                    tweet_id = re.sub(r"\D", "", tweet_url.split("/")[-1])
 
-                # 画像も動画も見つからない場合はHTMLから補助判定
-                if not has_media:
-                    article_html = article.get_attribute("outerHTML")
-                    if has_media_in_html(article_html):
-                        has_media = True
+                    if tweet_url in seen_urls:
+                        log.debug("🌀 既出URL(スキップ): %s", tweet_url)
+                        continue
+                    seen_urls.add(tweet_url)
 
-                if is_reply_structure(
-                    article, tweet_id=tweet_id, text=text, has_media=has_media
-                ):
-                    print(f"↪️ リプライまたは引用構造スキップ: {tweet_url}")
-                    continue
+                    if at_or_below_mark(tweet_url, tweet_id):
+                        if reached_mark:
+                            break
+                        continue
 
-                if is_ad_post(text):
-                    print(f"🚫 広告と判定→スキップ: {tweet_url}")
-                    continue
+                    text_el = article.find_element(
+                        By.XPATH, ".//div[@data-testid='tweetText']"
+                    )
+                    text = normalize_text(text_el.text) if text_el else ""
 
-                if already_registered(tweet_id):
-                    print(f"❌ 登録済→スキップ: {tweet_url}")
-                    continue
+                    images = [
+                        img.get_attribute("src")
+                        for img in article.find_elements(
+                            By.XPATH, ".//img[contains(@src, 'twimg.com/media')]"
+                        )
+                    ]
+                    videos = [
+                        v.get_attribute("src")
+                        for v in article.find_elements(By.XPATH, ".//video")
+                        if v.get_attribute("src")
+                    ]
+                    has_media = bool(images or videos)
+
+                    # 画像も動画も見つからない場合はHTMLから補助判定
+                    if not has_media:
+                        article_html = article.get_attribute("outerHTML")
+                        if has_media_in_html(article_html):
+                            has_media = True
 
-                tweet_urls.append({"url": tweet_url, "id": tweet_id})
+                    if is_reply_structure(
+                        article, tweet_id=tweet_id, text=text, has_media=has_media
+                    ):
+                        log.debug("↪️ リプライまたは引用構造スキップ: %s", tweet_url)
+                        continue
 
-                print(f"✅ 抽出: {tweet_url}")
-                if len(tweet_urls) >= max_tweets:
-                    break
+                    if add_candidate(tweet_url, tweet_id, text):
+                        break
 
-            except Exception as e:
-                print(f"⚠️ 投稿抽出エラー: {e}")
-                continue
+                except Exception as e:
+                    log.warning("⚠️ 投稿抽出エラー: %s", e)
+                    continue
+
+        if reached_mark:
+            break
 
         for _ in range(3):
             scroll_position += 1500
+            baseline = article_mutation_count(driver)
             driver.execute_script(f"window.scrollTo(0, {scroll_position});")
-            time.sleep(1.5)
+            wait_for_article_change(driver, baseline, READINESS_TIMEOUTS["scroll"])
 
         # ✅ 新規投稿の変化がないかチェック
         if len(seen_urls) == last_seen_count:
             pause_counter += 1
-            print(f"🧊 新規投稿なし → pause_counter={pause_counter}")
+            log.debug("🧊 新規投稿なし → pause_counter=%s", pause_counter)
             if pause_counter >= pause_threshold:
-                print("🛑 新しい投稿が検出されないため中断")
+                log.info("🛑 新しい投稿が検出されないため中断")
+                exhausted = True
                 break
         else:
             pause_counter = 0
@@ -837,195 +2146,1304 @@ def extract_tweets(driver, extract_target, max_tweets):
 
         scroll_count += 1
 
-    print(f"\n📈 取得完了 → 合計投稿数: {len(tweet_urls)} 件")
+    # 件数上限・スクロール上限で打ち切った場合は、mark より新しい未取得の投稿が残っている
+    timeline_scan_complete[extract_target.lower()] = reached_mark or exhausted
+    if high_water is None and registered_max is not None:
+        seed_high_water(extract_target, registered_max)
+    log.info("📈 取得完了 → 合計投稿数: %s 件", len(tweet_urls))
     return tweet_urls
 
 
-def already_registered(tweet_id):
-    if not tweet_id or not tweet_id.isdigit():
-        return False
-    query = {"filter": {"property": "投稿ID", "rich_text": {"equals": tweet_id}}}
-    try:
-        result = notion.databases.query(database_id=DATABASE_ID, **query)
-        return len(result.get("results", [])) > 0
-    except Exception as e:
-        print(f"⚠️ Notionクエリ失敗: {e}")
-        return False
+REGISTERED_INDEX_PATH = "registered_ids.sqlite3"
+registered_index = None
 
 
-def ocr_and_remove_image(image_path, label=None):
+class RegisteredIndex:
     """
-    画像パスを受け取りOCRし、使用後に削除する。
-    labelがあれば結果の先頭に付与。
+    登録済み投稿IDのローカル索引（SQLite）。
+    twitter_cookies.json と同じ場所に保存し、起動時に全IDをメモリ上のsetへ読み込む。
+    既登録判定はsetの参照のみでネットワークもSQLiteも触らない。
+    一度もNotionと同期できていない索引（synced=False）は空のため、既登録判定には使わない。
     """
-    result = ""
-    try:
-        ocr_result = ocr_image(image_path)
-        if ocr_result:
-            cleaned = clean_ocr_text(ocr_result)
-            result = f"[{label}]\n{cleaned}" if label else cleaned
-    except Exception as e:
-        print(f"⚠️ OCR失敗: {e}")
-    finally:
-        try:
-            os.remove(image_path)
-            print(f"🗑️ 画像削除: {image_path}")
-        except Exception as e:
-            print(f"⚠️ 画像削除失敗: {e}")
-    return result
 
+    def __init__(self, path=REGISTERED_INDEX_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS registered (tweet_id TEXT PRIMARY KEY)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+            )
+            self._ids = {
+                row[0] for row in self._conn.execute("SELECT tweet_id FROM registered")
+            }
+        self.synced = self.get_meta("last_synced_at") is not None
+
+    def __contains__(self, tweet_id):
+        return str(tweet_id) in self._ids
+
+    def __len__(self):
+        return len(self._ids)
+
+    def add(self, tweet_id):
+        self.add_many([tweet_id])
+
+    def add_many(self, tweet_ids):
+        rows = [(str(t),) for t in tweet_ids if t]
+        if not rows:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO registered (tweet_id) VALUES (?)", rows
+            )
+            self._ids.update(r[0] for r in rows)
+
+    def snapshot(self):
+        with self._lock:
+            return set(self._ids)
+
+    def replace_all(self, tweet_ids, known_before):
+        """
+        全件同期の結果で索引を置き換える（Notion側で削除されたIDを除く）。
+        取得中に mark_registered で追加されたID（known_before にないもの）は残す
+        """
+        with self._lock, self._conn:
+            ids = {str(t) for t in tweet_ids if t} | (self._ids - known_before)
+            self._conn.execute("DELETE FROM registered")
+            self._conn.executemany(
+                "INSERT INTO registered (tweet_id) VALUES (?)", [(t,) for t in ids]
+            )
+            self._ids = ids
+
+    def get_meta(self, key, default=None):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM meta WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key, value):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value)
+            )
 
-def clean_ocr_text(text):
-    # 除外したい文言やパターンをここに追加
-    EXCLUDE_PATTERNS = [
-        "朝質問を「いいね!」 する",
-        "この投稿をいいね！",
-        # 必要に応じて追加
-    ]
-    lines = text.splitlines()
-    cleaned = [
-        line for line in lines if not any(pat in line for pat in EXCLUDE_PATTERNS)
-    ]
-    return "\n".join(cleaned)
+    def get_high_water(self, account):
+        value = self.get_meta(f"high_water:{account.lower()}")
+        return int(value) if value else None
+
+    def raise_high_water(self, account, tweet_id):
+        """アカウントの登録済み最大投稿IDを更新（小さいIDでは下げない）"""
+        key = f"high_water:{account.lower()}"
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT value FROM meta WHERE key = ?", (key,)
+            ).fetchone()
+            if row and int(row[0]) >= int(tweet_id):
+                return
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                (key, str(tweet_id)),
+            )
 
+    def close(self):
+        with self._lock:
+            self._conn.close()
 
-def upload_to_notion(tweet):
-    print(f"📤 Notion登録処理開始: {tweet['id']}")
-    if already_registered(tweet["id"]):
-        print(f"🚫 スキップ済: {tweet['id']}")
-        return
 
-    props = {
-        "投稿ID": {
-            "rich_text": [{"type": "text", "text": {"content": str(tweet["id"])}}]
-        },
-        "本文": {
-            "rich_text": [
-                {
-                    "type": "text",
-                    "text": {
-                        "content": tweet["text"],
-                        "link": None,
-                    },
-                    "annotations": {
-                        "bold": False,
-                        "italic": False,
-                        "strikethrough": False,
-                        "underline": False,
-                        "code": False,
-                        "color": "default",
-                    },
-                }
-            ]
-        },
-        "URL": {"url": tweet["url"]},
-        "投稿日時": {"date": {"start": tweet["date"]} if tweet["date"] else None},
-        "ステータス": {"select": {"name": "未回答"}},
-        "インプレッション数": {
-            "number": (
-                int(tweet["impressions"])
-                if tweet.get("impressions") is not None
-                else None
-            )
-        },
-        "リポスト数": {
-            "number": int(tweet["retweets"]) if tweet.get("retweets") is not None else 0
-        },
-        "いいね数": {
-            "number": int(tweet["likes"]) if tweet.get("likes") is not None else 0
-        },
-        "ブックマーク数": {
-            "number": (
-                int(tweet["bookmarks"]) if tweet.get("bookmarks") is not None else 0
-            )
-        },
-        "リプライ数": {
-            "number": int(tweet["replies"]) if tweet.get("replies") is not None else 0
-        },
-        "文字起こし": {"rich_text": []},
-    }
+def get_post_id_from_page(page):
+    rich_text = page.get("properties", {}).get("投稿ID", {}).get("rich_text", [])
+    return "".join(r.get("plain_text", "") for r in rich_text).strip()
 
-    ocr_texts = []
 
-    # 画像ファイルのOCR（tweet["images"]）
-    for idx, img_url in enumerate(tweet.get("images", [])):
-        img_path = f"ocr_image_{tweet['id']}_{idx}.jpg"
-        try:
-            resp = requests.get(img_url, stream=True)
-            with open(img_path, "wb") as f:
-                for chunk in resp.iter_content(1024):
-                    f.write(chunk)
-            ocr_text = ocr_and_remove_image(img_path, label=f"画像{idx+1}")
-            if ocr_text:
-                ocr_texts.append(ocr_text)
-        except Exception as e:
-            print(f"⚠️ 画像ダウンロード失敗: {e}")
+def get_post_id_property_id():
+    """
+    filter_properties 用に「投稿ID」プロパティのIDを取得（取得失敗時はNone）
+    """
+    try:
+        database = notion.databases.retrieve(database_id=DATABASE_ID)
+        prop_id = database.get("properties", {}).get("投稿ID", {}).get("id")
+        # APIはURLエンコード済みのIDを返すため、クライアント側の再エンコード前に戻す
+        return unquote(prop_id) if prop_id else None
+    except Exception as e:
+        log.warning("⚠️ 投稿IDプロパティID取得失敗 → 全プロパティ取得で継続: %s", e)
+        return None
 
-    # poster画像のOCR
-    poster_path = tweet.get("video_poster")
-    if poster_path:
-        ocr_text = ocr_and_remove_image(poster_path, label="動画サムネイル")
-        if ocr_text:
-            ocr_texts.append(ocr_text)
 
-    if ocr_texts:
-        props["文字起こし"]["rich_text"] = [
-            {"type": "text", "text": {"content": "\n\n".join(ocr_texts)}}
-        ]
+def iter_registered_ids_from_notion(edited_after=None):
+    """
+    Notionデータベースを start_cursor/has_more でページングし、投稿IDを順に返す。
+    取得するのは投稿IDプロパティのみ。edited_after指定時は差分のみ取得する。
+    """
+    prop_id = get_post_id_property_id()
+    start_cursor = None
+    while True:
+        query = {"page_size": 100}
+        if prop_id:
+            query["filter_properties"] = [prop_id]
+        if edited_after:
+            query["filter"] = {
+                "timestamp": "last_edited_time",
+                "last_edited_time": {"on_or_after": edited_after},
+            }
+        if start_cursor:
+            query["start_cursor"] = start_cursor
+        result = notion.databases.query(database_id=DATABASE_ID, **query)
+        for page in result.get("results", []):
+            post_id = get_post_id_from_page(page)
+            if post_id:
+                yield post_id
+        if not result.get("has_more"):
+            break
+        start_cursor = result.get("next_cursor")
 
-    children_blocks = []
 
+def sync_registered_index(index, full=False):
+    """
+    スクレイピング開始前に登録済み投稿IDをNotionと同期する。
+    初回は全件、2回目以降は前回同期以降に編集されたページのみ取得。
+    差分ではNotion側で削除されたページが分からないため、full=True なら全件取得して置き換える。
+    """
+    last_synced = None if full else index.get_meta("last_synced_at")
+    # Notionの last_edited_time は分単位に丸められるため少し遡って取得する
+    started_at = datetime.now(timezone.utc) - timedelta(minutes=2)
+    if last_synced:
+        log.info("🔄 登録済み投稿IDを差分同期中…（%s 以降）", last_synced)
+    else:
+        log.info("📥 登録済み投稿IDをNotionから全件取得中…")
+    before = len(index)
     try:
-        new_page = notion.pages.create(
-            parent={"database_id": DATABASE_ID},
-            properties=props,
-            children=children_blocks,
-        )
-        print(f"📝 Notion登録完了: {tweet['url']}")
+        if full:
+            known_before = index.snapshot()
+            index.replace_all(list(iter_registered_ids_from_notion()), known_before)
+        else:
+            index.add_many(iter_registered_ids_from_notion(edited_after=last_synced))
+        index.set_meta("last_synced_at", started_at.isoformat())
+        index.synced = True
     except Exception as e:
-        print(f"❌ Notion登録失敗: {tweet['id']} エラー: {e}")
+        log.warning("⚠️ 登録済みID同期失敗（次回再取得）: %s", e)
+        if not index.synced:
+            log.warning(
+                "⚠️ 登録済みID索引が未同期のため、投稿ごとにNotionへ問い合わせます"
+            )
+    log.info(
+        "🗂️ 登録済みID索引: %s 件（%+d） (%s)",
+        len(index),
+        len(index) - before,
+        index.path,
+    )
 
 
-def load_config(path):
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+def load_registered_index(path=REGISTERED_INDEX_PATH):
+    index = RegisteredIndex(path)
+    sync_registered_index(index)
+    return index
 
 
-def is_recruit_account(name, bio, config):
-    return any(
-        k in name or k in bio for k in config.get("filter_keywords_name_bio", [])
-    )
+def mark_registered(tweet_id):
+    if registered_index is not None and tweet_id:
+        registered_index.add(tweet_id)
 
 
-def is_recruit_post(text, config):
-    return any(k in text for k in config.get("filter_keywords_tweet", []))
+def get_high_water(account):
+    if not INCREMENTAL_CRAWL or registered_index is None or not account:
+        return None
+    return registered_index.get_high_water(account)
 
 
-def search_accounts(driver, keyword_list):
-    results = []
-    for keyword in keyword_list:
-        search_url = f"https://twitter.com/search?q={keyword}&f=user"
-        driver.get(search_url)
-        time.sleep(3)
+def raise_high_water(account, tweet_id):
+    if registered_index is not None and account and str(tweet_id).isdigit():
+        registered_index.raise_high_water(account, tweet_id)
 
-        # ⚠ 新UI構造に対応
-        users = driver.find_elements(
-            By.XPATH, "//a[contains(@href, '/')]//div[@dir='auto']/../../.."
+
+def seed_high_water(account, tweet_id):
+    """
+    mark のないアカウントに、登録済みの本人投稿IDを mark の初期値として設定する。
+    それより新しい未登録の投稿は次回以降も走査されるため、走査が末尾まで届いていなくてよい
+    """
+    if not INCREMENTAL_CRAWL or registered_index is None:
+        return
+    if registered_index.get_high_water(account) is None:
+        log.info(
+            "📍 @%s の high-water mark を登録済み投稿 %s で初期化", account, tweet_id
         )
-        print(f"🔍 候補ユーザー件数: {len(users)}")
+        registered_index.raise_high_water(account, tweet_id)
 
-        for user in users:
-            try:
-                spans = user.find_elements(By.XPATH, ".//span")
-                name = ""
-                username = ""
 
-                for span in spans:
-                    text = span.text.strip()
-                    if text.startswith("@"):
-                        username = text.replace("@", "")
-                    elif not name:
-                        name = text
+def scan_reached_mark(account, capped):
+    """
+    直前の discover_tweet_urls の走査が high-water mark（またはタイムラインの末尾）まで届き、
+    かつその後の処理が件数上限で打ち切られていなければ（capped=False）True。
+    False の場合は mark を据え置き、上限からあふれた古い投稿を次回の走査で拾う
+    """
+    complete = timeline_scan_complete.pop(account.lower(), False)
+    if complete and not capped:
+        return True
+    if INCREMENTAL_CRAWL:
+        log.info("📍 @%s は上限で打ち切ったため high-water mark を据え置き", account)
+    return False
+
+
+def tag_timeline_account(tweets, account, max_tweets, tweet_urls):
+    """
+    mark を進めてよい場合のみ、登録時に mark を更新する目印を付ける。
+    tweet_urls のうち詳細ページを読み込めなかった投稿があれば、
+    mark がそれを越えないよう、そのIDより新しい投稿には目印を付けない
+    """
+    urls = {meta["url"] if isinstance(meta, dict) else meta for meta in tweet_urls}
+    with failed_detail_lock:
+        failed = urls & failed_detail_urls
+        failed_detail_urls.difference_update(failed)
+    failed_ids = [re.sub(r"\D", "", url.split("/")[-1]) for url in failed]
+    ceiling = min((int(i) for i in failed_ids if i), default=None)
+    if not scan_reached_mark(account, capped=len(tweets) >= max_tweets):
+        return
+    if ceiling is not None:
+        log.info(
+            "📍 @%s は詳細ページを読み込めなかった投稿 %s の手前で mark を止める",
+            account,
+            ceiling,
+        )
+    for tweet in tweets:
+        if ceiling is None or int(tweet["id"]) < ceiling:
+            tweet["timeline_account"] = account
+
+
+@instrumented("already_registered")
+def already_registered(tweet_id):
+    if not tweet_id or not tweet_id.isdigit():
+        return False
+    if registered_index is not None and registered_index.synced:
+        found = tweet_id in registered_index
+        run_metrics.inc("registered_lookups", result="hit" if found else "miss")
+        return found
+    query = {"filter": {"property": "投稿ID", "rich_text": {"equals": tweet_id}}}
+    try:
+        result = notion.databases.query(database_id=DATABASE_ID, **query)
+        return len(result.get("results", [])) > 0
+    except Exception as e:
+        log.warning("⚠️ Notionクエリ失敗: %s", e)
+        return False
+
+
+# 中断時の再開用ジャーナル（--resume で前回の続きから処理）
+CRAWL_JOURNAL_PATH = "crawl_journal.sqlite3"
+crawl_journal = None
+
+
+class CrawlJournal:
+    """
+    クロール状態のジャーナル（SQLite）。
+    収集したURL一覧・詳細ページの抽出結果・OCR結果・Notion登録状況を
+    投稿IDごとに記録し、Chromeのクラッシュや強制終了後に --resume で再開できるようにする。
+    """
+
+    def __init__(self, path=CRAWL_JOURNAL_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS urls ("
+                "job TEXT, seq INTEGER, url TEXT, PRIMARY KEY (job, url))"
+            )
+            # payload が NULL の行は「訪問済みだが対象外」を表す
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS details (url TEXT PRIMARY KEY, payload TEXT)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS tweets ("
+                "tweet_id TEXT PRIMARY KEY, ocr_texts TEXT, uploaded INTEGER DEFAULT 0)"
+            )
+
+    def reset(self):
+        with self._lock, self._conn:
+            for table in ("urls", "details", "tweets"):
+                self._conn.execute(f"DELETE FROM {table}")
+
+    def save_urls(self, job, urls):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM urls WHERE job = ?", (job,))
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO urls (job, seq, url) VALUES (?, ?, ?)",
+                [(job, i, url) for i, url in enumerate(urls)],
+            )
+
+    def load_urls(self, job):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT url FROM urls WHERE job = ? ORDER BY seq", (job,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def record_thread(self, url, thread):
+        post = None
+        if thread:
+            post = {k: v for k, v in thread[0].items() if k != "article"}
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO details (url, payload) VALUES (?, ?)",
+                (url, json.dumps(post, ensure_ascii=False) if post else None),
+            )
+
+    def load_thread(self, url):
+        """訪問済みなら [post] または []、未訪問なら None を返す"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM details WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        return [json.loads(row[0])] if row[0] else []
+
+    def record_ocr(self, tweet_id, ocr_texts):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO tweets (tweet_id, ocr_texts) VALUES (?, ?) "
+                "ON CONFLICT (tweet_id) DO UPDATE SET ocr_texts = excluded.ocr_texts",
+                (str(tweet_id), json.dumps(ocr_texts, ensure_ascii=False)),
+            )
+
+    def load_ocr(self, tweet_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT ocr_texts FROM tweets WHERE tweet_id = ?", (str(tweet_id),)
+            ).fetchone()
+        return json.loads(row[0]) if row and row[0] is not None else None
+
+    def mark_uploaded(self, tweet_id):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO tweets (tweet_id, uploaded) VALUES (?, 1) "
+                "ON CONFLICT (tweet_id) DO UPDATE SET uploaded = 1",
+                (str(tweet_id),),
+            )
+
+    def is_uploaded(self, tweet_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT uploaded FROM tweets WHERE tweet_id = ?", (str(tweet_id),)
+            ).fetchone()
+        return bool(row and row[0])
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def load_crawl_journal(path=CRAWL_JOURNAL_PATH, resume=False):
+    journal = CrawlJournal(path)
+    if resume:
+        log.info("⏯️ 前回の続きから再開: %s", path)
+    else:
+        journal.reset()
+    return journal
+
+
+def journal_thread(tweet_url, thread):
+    if crawl_journal is not None:
+        crawl_journal.record_thread(tweet_url, thread)
+
+
+def mark_uploaded(tweet_id):
+    if crawl_journal is not None and tweet_id:
+        crawl_journal.mark_uploaded(tweet_id)
+
+
+def discover_tweet_urls(driver, extract_target, max_tweets):
+    """
+    タイムラインから投稿URLを収集する。再開時はジャーナルのURL一覧を使いスクロールを省略
+    """
+    job = f"timeline:{extract_target}"
+    if crawl_journal is not None:
+        urls = crawl_journal.load_urls(job)
+        if urls:
+            log.info("⏯️ @%s の収集済みURL %s 件を再利用", extract_target, len(urls))
+            return urls
+    high_water = get_high_water(extract_target)
+    if high_water is not None:
+        log.info("📍 @%s の high-water mark: %s", extract_target, high_water)
+    tweet_dicts = extract_tweets(driver, extract_target, max_tweets, high_water)
+    urls = [t["url"] for t in tweet_dicts if "url" in t]
+    if crawl_journal is not None:
+        crawl_journal.save_urls(job, urls)
+    return urls
+
+
+def ocr_and_remove_image(image, label=None):
+    """
+    画像（バイト列またはファイルパス）を受け取りOCRし、ファイルの場合は使用後に削除する。
+    labelがあれば結果の先頭に付与。
+    """
+    result = ""
+    try:
+        ocr_result = ocr_image(image)
+        if ocr_result:
+            result = label_ocr_text(clean_ocr_text(ocr_result), label)
+    except Exception as e:
+        log.warning("⚠️ OCR失敗: %s", e)
+    finally:
+        remove_image(image)
+    return result
+
+
+def label_ocr_text(text, label=None):
+    return f"[{label}]\n{text}" if text and label else text
+
+
+def remove_image(image_path):
+    if not isinstance(image_path, str):
+        return
+    try:
+        os.remove(image_path)
+        log.debug("🗑️ 画像削除: %s", image_path)
+    except Exception as e:
+        log.warning("⚠️ 画像削除失敗: %s", e)
+
+
+OCR_CACHE_PATH = "ocr_cache.sqlite3"
+OCR_CACHE_MAX_ENTRIES = 5000
+ocr_cache = None
+
+
+def perceptual_hash(data):
+    """
+    画像のdHash（64bit）。再エンコードや軽微な縮小では数bitしか変わらない
+    """
+    img = Image.open(BytesIO(data)).convert("L").resize((9, 8))
+    pixels = list(img.getdata())
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            left = pixels[row * 9 + col]
+            right = pixels[row * 9 + col + 1]
+            value = (value << 1) | (1 if left > right else 0)
+    return value
+
+
+class OcrCache:
+    """
+    画像バイト列のハッシュをキーにしたOCR結果の永続キャッシュ（SQLite）。
+    同じチラシ画像・動画サムネイルの再投稿でOCRをやり直さないために使う。
+    use_phash=True なら知覚ハッシュで再エンコードされたコピーも同一とみなす。
+    件数が max_entries を超えたら最後に使われた時刻の古いものから削除する。
+    """
+
+    def __init__(
+        self,
+        path=OCR_CACHE_PATH,
+        max_entries=OCR_CACHE_MAX_ENTRIES,
+        use_phash=False,
+        phash_distance=4,
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.use_phash = use_phash
+        self.phash_distance = phash_distance
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS ocr_cache ("
+                "sha256 TEXT PRIMARY KEY, phash TEXT, text TEXT, last_used REAL)"
+            )
+            self._phashes = {
+                row[0]: int(row[1], 16)
+                for row in self._conn.execute(
+                    "SELECT sha256, phash FROM ocr_cache WHERE phash IS NOT NULL"
+                )
+            }
+
+    def _find_similar(self, phash):
+        for sha, other in self._phashes.items():
+            if bin(phash ^ other).count("1") <= self.phash_distance:
+                return sha
+        return None
+
+    def lookup(self, data):
+        """
+        キャッシュ済みのOCR結果とキー情報を返す（未登録なら結果はNone）
+        """
+        sha = hashlib.sha256(data).hexdigest()
+        phash = None
+        if self.use_phash:
+            try:
+                phash = perceptual_hash(data)
+            except Exception as e:
+                log.warning("⚠️ 知覚ハッシュ計算失敗: %s", e)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT sha256, text FROM ocr_cache WHERE sha256 = ?", (sha,)
+            ).fetchone()
+            if row is None and phash is not None:
+                similar = self._find_similar(phash)
+                if similar:
+                    row = self._conn.execute(
+                        "SELECT sha256, text FROM ocr_cache WHERE sha256 = ?",
+                        (similar,),
+                    ).fetchone()
+            if row is None:
+                self.misses += 1
+                run_metrics.inc("ocr_cache_lookups", result="miss")
+                return None, (sha, phash)
+            self.hits += 1
+            run_metrics.inc("ocr_cache_lookups", result="hit")
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE ocr_cache SET last_used = ? WHERE sha256 = ?",
+                    (time.time(), row[0]),
+                )
+        return row[1], (sha, phash)
+
+    def lookup_image(self, image):
+        return self.lookup(read_image_bytes(image))
+
+    def store(self, key, text):
+        if text == "[OCRエラー]":
+            return
+        sha, phash = key
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ocr_cache (sha256, phash, text, last_used) "
+                "VALUES (?, ?, ?, ?)",
+                (
+                    sha,
+                    f"{phash:016x}" if phash is not None else None,
+                    text,
+                    time.time(),
+                ),
+            )
+            if phash is not None:
+                self._phashes[sha] = phash
+            overflow = (
+                self._conn.execute("SELECT COUNT(*) FROM ocr_cache").fetchone()[0]
+                - self.max_entries
+            )
+            if overflow > 0:
+                evicted = [
+                    row[0]
+                    for row in self._conn.execute(
+                        "SELECT sha256 FROM ocr_cache ORDER BY last_used LIMIT ?",
+                        (overflow,),
+                    )
+                ]
+                self._conn.executemany(
+                    "DELETE FROM ocr_cache WHERE sha256 = ?", [(e,) for e in evicted]
+                )
+                for e in evicted:
+                    self._phashes.pop(e, None)
+
+    def report(self):
+        total = self.hits + self.misses
+        rate = self.hits / total * 100 if total else 0
+        log.info(
+            "🧠 OCRキャッシュ: hit=%s miss=%s (%.0f%%)", self.hits, self.misses, rate
+        )
+
+
+def ocr_and_remove_image_cached(image, label=None):
+    """
+    OCRキャッシュを参照してから ocr_and_remove_image を実行する
+    """
+    if ocr_cache is None:
+        return ocr_and_remove_image(image, label)
+    try:
+        cached, key = ocr_cache.lookup_image(image)
+    except Exception as e:
+        log.warning("⚠️ OCRキャッシュ参照失敗: %s", e)
+        return ocr_and_remove_image(image, label)
+    if cached is not None:
+        remove_image(image)
+        return label_ocr_text(cached, label)
+    text = ocr_and_remove_image(image)
+    ocr_cache.store(key, text)
+    return label_ocr_text(text, label)
+
+
+# True の場合のみOCR対象の画像をファイルに書き出す（デバッグ用）
+SAVE_MEDIA_FILES = False
+
+
+# 画像取得の並列数・タイムアウト（秒）・再試行回数
+MEDIA_FETCH_WORKERS = 8
+MEDIA_TIMEOUT = 15
+MEDIA_RETRIES = 3
+media_fetcher = None
+
+
+class MediaFetcher:
+    """
+    画像取得用の共有HTTPクライアント。
+    ホストごとにkeep-alive接続を使い回し（pbs.twimg.com へのTLSハンドシェイクを毎回行わない）、
+    タイムアウト・バックオフ付き再試行・並列数の上限を持つ。
+    """
+
+    def __init__(
+        self, workers=MEDIA_FETCH_WORKERS, timeout=MEDIA_TIMEOUT, retries=MEDIA_RETRIES
+    ):
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=max(1, workers),
+            max_retries=Retry(
+                total=retries,
+                backoff_factor=0.5,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=frozenset(["GET"]),
+            ),
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.executor = ThreadPoolExecutor(max_workers=max(1, workers))
+
+    @instrumented("media_fetch")
+    def fetch(self, url):
+        resp = self.session.get(url, timeout=self.timeout)
+        resp.raise_for_status()
+        run_metrics.inc("media_bytes", len(resp.content))
+        return resp.content
+
+    def fetch_many(self, urls):
+        """
+        複数URLを並列取得し、入力と同じ順に bytes または例外を返す
+        """
+        futures = [self.executor.submit(self.fetch, url) for url in urls]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def close(self):
+        self.executor.shutdown()
+        self.session.close()
+
+
+def get_media_fetcher():
+    global media_fetcher
+    if media_fetcher is None:
+        media_fetcher = MediaFetcher()
+    return media_fetcher
+
+
+def fetch_media_bytes(url):
+    return get_media_fetcher().fetch(url)
+
+
+def ocr_target_sources(tweet):
+    """
+    OCR対象を (URLまたは保存済みファイルパス, ラベル) として 画像{n} → 動画サムネイル の順で返す
+    """
+    sources = [
+        (img_url, f"画像{idx+1}") for idx, img_url in enumerate(tweet.get("images", []))
+    ]
+    if tweet.get("video_poster"):
+        sources.append((tweet["video_poster"], "動画サムネイル"))
+    elif tweet.get("video_poster_url"):
+        sources.append((tweet["video_poster_url"], "動画サムネイル"))
+    return sources
+
+
+def download_ocr_targets_batch(tweets):
+    """
+    複数投稿のOCR対象画像をまとめて並列取得し、投稿ごとに (画像, ラベル) のリストを返す。
+    画像は通常メモリ上のバイト列、save_media_files 有効時のみファイルパス。
+    """
+    per_tweet = [ocr_target_sources(tweet) for tweet in tweets]
+    urls = [
+        src
+        for sources in per_tweet
+        for src, _ in sources
+        if src.startswith(("http://", "https://"))
+    ]
+    fetched = iter(get_media_fetcher().fetch_many(urls))
+
+    batch = []
+    for tweet, sources in zip(tweets, per_tweet):
+        targets = []
+        for idx, (src, label) in enumerate(sources):
+            if not src.startswith(("http://", "https://")):
+                # save_media_files で保存済みのposterファイル
+                targets.append((src, label))
+                continue
+            data = next(fetched)
+            if isinstance(data, Exception):
+                log.warning("⚠️ 画像ダウンロード失敗（%s）: %s", label, data)
+                continue
+            if SAVE_MEDIA_FILES:
+                img_path = f"ocr_image_{tweet['id']}_{idx}.jpg"
+                with open(img_path, "wb") as f:
+                    f.write(data)
+                targets.append((img_path, label))
+            else:
+                targets.append((data, label))
+        batch.append(targets)
+    return batch
+
+
+def download_ocr_targets(tweet):
+    """
+    1投稿分のOCR対象画像を並列取得し、(画像, ラベル) のリストを返す
+    """
+    return download_ocr_targets_batch([tweet])[0]
+
+
+# OCR用のプロセス数（tesseractはCPUを使い切るため、ブラウザ用に1コア残す）
+OCR_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+
+
+class OcrStage:
+    """
+    バッチ内の全画像・動画サムネイルをまとめて ProcessPoolExecutor に投入し、
+    投稿ごとに元のラベル順で結果を回収する
+    """
+
+    def __init__(self, workers=OCR_WORKERS):
+        self.pool = ProcessPoolExecutor(
+            max_workers=max(1, workers),
+            initializer=init_worker_logging,
+            initargs=worker_logging_args(),
+        )
+        self._pending = {}
+
+    def _submit(self, image, label):
+        """(ラベル, キャッシュキー, future, キャッシュ済み結果) を返す"""
+        if ocr_cache is not None:
+            try:
+                cached, key = ocr_cache.lookup_image(image)
+                if cached is not None:
+                    remove_image(image)
+                    return label, None, None, cached
+                return label, key, self._submit_ocr(image), None
+            except Exception as e:
+                log.warning("⚠️ OCRキャッシュ参照失敗: %s", e)
+        return label, None, self._submit_ocr(image), None
+
+    def _submit_ocr(self, image):
+        # 子プロセス内の所要時間を結果と一緒に受け取り、親の run_metrics に記録する
+        return self.pool.submit(timed_call, ocr_and_remove_image, image)
+
+    def submit_batch(self, tweets):
+        total = 0
+        for tweet, targets in zip(tweets, download_ocr_targets_batch(tweets)):
+            jobs = [self._submit(image, label) for image, label in targets]
+            self._pending[tweet["id"]] = jobs
+            total += len(jobs)
+        log.info("🧮 OCR投入: %s 件の投稿 / %s 枚の画像", len(tweets), total)
+
+    def collect(self, tweet):
+        """投稿のOCR結果を 画像{n} → 動画サムネイル の順で返す"""
+        ocr_texts = []
+        for label, key, future, text in self._pending.pop(tweet["id"], []):
+            if future is not None:
+                try:
+                    text, seconds = future.result()
+                    run_metrics.observe("ocr_image", seconds)
+                except Exception as e:
+                    log.warning("⚠️ OCR失敗: %s", e)
+                    continue
+                if key is not None:
+                    ocr_cache.store(key, text)
+            ocr_text = label_ocr_text(text, label)
+            if ocr_text:
+                ocr_texts.append(ocr_text)
+        return ocr_texts
+
+    def shutdown(self):
+        self.pool.shutdown()
+
+
+def clean_ocr_text(text):
+    # 除外したい文言やパターンをここに追加
+    EXCLUDE_PATTERNS = [
+        "朝質問を「いいね!」 する",
+        "この投稿をいいね！",
+        # 必要に応じて追加
+    ]
+    lines = text.splitlines()
+    cleaned = [
+        line for line in lines if not any(pat in line for pat in EXCLUDE_PATTERNS)
+    ]
+    return "\n".join(cleaned)
+
+
+def build_notion_job(tweet):
+    """
+    OCRを含めてNotionへ送るpropertiesを組み立てる。登録済みならNone
+    """
+    log.info("📤 Notion登録処理開始: %s", tweet["id"])
+    if already_registered(tweet["id"]):
+        log.info("🚫 スキップ済: %s", tweet["id"])
+        return None
+
+    props = {
+        "投稿ID": {
+            "rich_text": [{"type": "text", "text": {"content": str(tweet["id"])}}]
+        },
+        "本文": {
+            "rich_text": [
+                {
+                    "type": "text",
+                    "text": {
+                        "content": tweet["text"],
+                        "link": None,
+                    },
+                    "annotations": {
+                        "bold": False,
+                        "italic": False,
+                        "strikethrough": False,
+                        "underline": False,
+                        "code": False,
+                        "color": "default",
+                    },
+                }
+            ]
+        },
+        "URL": {"url": tweet["url"]},
+        "投稿日時": {"date": {"start": tweet["date"]} if tweet["date"] else None},
+        "ステータス": {"select": {"name": "未回答"}},
+        "インプレッション数": {
+            "number": (
+                int(tweet["impressions"])
+                if tweet.get("impressions") is not None
+                else None
+            )
+        },
+        "リポスト数": {
+            "number": int(tweet["retweets"]) if tweet.get("retweets") is not None else 0
+        },
+        "いいね数": {
+            "number": int(tweet["likes"]) if tweet.get("likes") is not None else 0
+        },
+        "ブックマーク数": {
+            "number": (
+                int(tweet["bookmarks"]) if tweet.get("bookmarks") is not None else 0
+            )
+        },
+        "リプライ数": {
+            "number": int(tweet["replies"]) if tweet.get("replies") is not None else 0
+        },
+        "文字起こし": {"rich_text": []},
+    }
+
+    if "ocr_texts" in tweet:
+        # OcrStage で処理済み
+        ocr_texts = tweet["ocr_texts"]
+    else:
+        ocr_texts = []
+        for image, label in download_ocr_targets(tweet):
+            ocr_text = ocr_and_remove_image_cached(image, label=label)
+            if ocr_text:
+                ocr_texts.append(ocr_text)
+
+    if ocr_texts:
+        props["文字起こし"]["rich_text"] = [
+            {"type": "text", "text": {"content": "\n\n".join(ocr_texts)}}
+        ]
+
+    job = {"id": str(tweet["id"]), "url": tweet["url"], "properties": props}
+    # タイムラインから収集した本人の投稿のみ high-water mark の対象にする
+    account = tweet.get("timeline_account")
+    if account and account.lower() == (tweet.get("username") or "").lower():
+        job["account"] = account
+    return job
+
+
+@instrumented("notion_create_page")
+def create_notion_page(job):
+    notion.pages.create(
+        parent={"database_id": DATABASE_ID},
+        properties=job["properties"],
+        children=[],
+    )
+    log.info("📝 Notion登録完了: %s", job["url"])
+    mark_registered(job["id"])
+    mark_uploaded(job["id"])
+    raise_high_water(job.get("account"), job["id"])
+
+
+@instrumented("upload_to_notion")
+def upload_to_notion(tweet):
+    job = build_notion_job(tweet)
+    if job is None:
+        return
+    try:
+        create_notion_page(job)
+    except Exception as e:
+        log.warning("❌ Notion登録失敗: %s エラー: %s", tweet["id"], e)
+
+
+# Notionへの登録（pages.create）の並列数・秒間リクエスト上限・再送キュー
+NOTION_UPLOAD_WORKERS = 1  # 2以上にすると並列に登録するが、ID昇順の登録順は保証されない
+NOTION_RATE_LIMIT = 3.0  # Notion API の平均リクエスト上限（req/s）
+NOTION_MAX_ATTEMPTS = 5
+NOTION_RETRY_QUEUE_PATH = "notion_retry_queue.jsonl"
+
+
+class TokenBucket:
+    """
+    スレッド間で共有するトークンバケット。429受信時は pause() で全ワーカーを待たせる
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def pause(self, seconds):
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now >= self._paused_until:
+                    elapsed = now - max(self._updated, self._paused_until)
+                    self._tokens = min(
+                        self.capacity, self._tokens + max(elapsed, 0) * self.rate
+                    )
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+                else:
+                    wait = self._paused_until - now
+            time.sleep(wait)
+
+
+def get_retry_after(error, attempt):
+    """
+    Notionのエラーから再送までの待ち秒数を返す。再送しても無駄なエラーはNone
+    """
+    status = getattr(error, "status", None)
+    if status is not None and status != 429 and status < 500:
+        return None
+    headers = getattr(error, "headers", None) or {}
+    retry_after = headers.get("retry-after") if hasattr(headers, "get") else None
+    try:
+        return float(retry_after)
+    except (TypeError, ValueError):
+        return min(2**attempt, 60)
+
+
+class NotionUploader:
+    """
+    Notion登録を少数のワーカースレッドで並列実行する。
+    ・TokenBucketでNotionのリクエスト上限に合わせて送信
+    ・429/5xx/通信エラーは Retry-After（なければ指数バックオフ）で再送
+    ・再送上限に達したジョブはディスク上の再送キューに保存し、次回起動時に再投入
+    submit() はすぐ戻るため、スクレイピングはNotionの応答を待たない
+    """
+
+    def __init__(
+        self,
+        workers=NOTION_UPLOAD_WORKERS,
+        rate=NOTION_RATE_LIMIT,
+        max_attempts=NOTION_MAX_ATTEMPTS,
+        retry_queue_path=NOTION_RETRY_QUEUE_PATH,
+    ):
+        self.bucket = TokenBucket(rate)
+        self.max_attempts = max_attempts
+        self.retry_queue_path = retry_queue_path
+        self._jobs = queue.Queue()
+        self._failed = []
+        self._lock = threading.Lock()
+        self._threads = [
+            threading.Thread(target=self._run, daemon=True)
+            for _ in range(max(1, workers))
+        ]
+        for t in self._threads:
+            t.start()
+
+    def submit(self, tweet):
+        self._jobs.put(("tweet", tweet))
+
+    def drain_retry_queue(self):
+        if not os.path.exists(self.retry_queue_path):
+            return 0
+        with open(self.retry_queue_path, "r", encoding="utf-8") as f:
+            jobs = [json.loads(line) for line in f if line.strip()]
+        for job in jobs:
+            self._jobs.put(("job", job))
+        if jobs:
+            log.info("♻️ 前回の再送キューから %s 件を再投入", len(jobs))
+        return len(jobs)
+
+    def flush(self):
+        """投入済みのジョブ（再送待ちを含む）がすべて終わるまで待つ"""
+        self._jobs.join()
+
+    def close(self):
+        for _ in self._threads:
+            self._jobs.put(None)
+        for t in self._threads:
+            t.join()
+        # 今回も失敗したジョブだけを再送キューに残す
+        with open(self.retry_queue_path, "w", encoding="utf-8") as f:
+            for job in self._failed:
+                f.write(json.dumps(job, ensure_ascii=False) + "\n")
+        if self._failed:
+            log.info(
+                "📮 再送キューに %s 件を保存: %s",
+                len(self._failed),
+                self.retry_queue_path,
+            )
+
+    def _run(self):
+        while True:
+            item = self._jobs.get()
+            if item is None:
+                self._jobs.task_done()
+                return
+            kind, payload = item
+            try:
+                if kind == "tweet":
+                    job = build_notion_job(payload)
+                elif already_registered(payload["id"]):
+                    log.info("🚫 スキップ済: %s", payload["id"])
+                    job = None
+                else:
+                    job = payload
+                if job is not None:
+                    self._create_with_retry(job)
+            except Exception as e:
+                log.warning("❌ Notion登録準備失敗: %s", e)
+            finally:
+                self._jobs.task_done()
+
+    def _create_with_retry(self, job):
+        for attempt in range(1, self.max_attempts + 1):
+            self.bucket.acquire()
+            try:
+                create_notion_page(job)
+                return
+            except Exception as e:
+                wait = get_retry_after(e, attempt)
+                if wait is None:
+                    log.warning(
+                        "❌ Notion登録失敗（再送不可）: %s エラー: %s", job["id"], e
+                    )
+                    run_metrics.inc("notion_failures", reason="fatal")
+                    return
+                if getattr(e, "status", None) == 429:
+                    self.bucket.pause(wait)
+                if attempt == self.max_attempts:
+                    log.warning("⚠️ Notion登録失敗: %s エラー: %s", job["id"], e)
+                    break
+                log.info(
+                    "⏳ Notion登録再試行 %s/%s: %s %.1f秒後 (%s)",
+                    attempt,
+                    self.max_attempts,
+                    job["id"],
+                    wait,
+                    e,
+                )
+                run_metrics.inc("notion_retries")
+                time.sleep(wait)
+        log.info("📮 Notion登録を再送キューへ: %s", job["id"])
+        run_metrics.inc("notion_failures", reason="queued")
+        with self._lock:
+            self._failed.append(job)
+            # 途中でプロセスが落ちても失われないよう即座に追記しておく
+            with open(self.retry_queue_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(job, ensure_ascii=False) + "\n")
+
+
+def load_config(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+# キーワード一覧ごとに1回だけ組み立てるキーワード判定器。
+# targets で対象ごとにキーワードを上書きできるよう、設定項目名ではなく内容をキーにする
+keyword_matchers = {}
+keyword_matchers_lock = threading.Lock()
+
+
+def build_keyword_matchers(config):
+    for key in ("filter_keywords_name_bio", "filter_keywords_tweet"):
+        get_keyword_matcher(config, key)
+
+
+def get_keyword_matcher(config, key):
+    keywords = config.get(key) or []
+    min_score = config.get("keyword_min_scores", {}).get(key)
+    cache_key = (json.dumps(keywords, ensure_ascii=False, sort_keys=True), min_score)
+    with keyword_matchers_lock:
+        if cache_key not in keyword_matchers:
+            keyword_matchers[cache_key] = KeywordMatcher(keywords, min_score)
+        return keyword_matchers[cache_key]
+
+
+def is_recruit_account(name, bio, config):
+    return bool(
+        get_keyword_matcher(config, "filter_keywords_name_bio").match(name, bio)
+    )
+
+
+def is_recruit_post(text, config):
+    return bool(get_keyword_matcher(config, "filter_keywords_tweet").match(text))
+
+
+# プロフィール（表示名・bio・name/bioフィルタ判定）のキャッシュ
+PROFILE_CACHE_PATH = "profile_cache.sqlite3"
+PROFILE_CACHE_TTL_HOURS = 24
+profile_cache = None
+
+
+def matches_name_bio(name, bio, keywords):
+    matched = as_keyword_matcher(keywords).match(name, bio)
+    if matched and log.isEnabledFor(logging.DEBUG):
+        log.debug("🔑 name/bio一致キーワード: %s", ", ".join(matched))
+    return bool(matched)
+
+
+class ProfileCache:
+    """
+    ユーザー名をキーにしたプロフィールキャッシュ（SQLite）。
+    TTL内であればプロフィールを開かずに name/bio フィルタを判定する。
+    判定結果はキーワード一覧のハッシュと一緒に保存し、キーワードが変わったら
+    キャッシュ済みの表示名・bioから判定し直す。
+    """
+
+    def __init__(self, path=PROFILE_CACHE_PATH, ttl_hours=PROFILE_CACHE_TTL_HOURS):
+        self.path = path
+        self.ttl = timedelta(hours=ttl_hours)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS profiles ("
+                "username TEXT PRIMARY KEY, display_name TEXT, bio TEXT, "
+                "fetched_at TEXT, keywords_hash TEXT, verdict INTEGER)"
+            )
+
+    def get(self, username):
+        """TTL内なら (表示名, bio, キーワードハッシュ, 判定) を返す"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT display_name, bio, fetched_at, keywords_hash, verdict "
+                "FROM profiles WHERE username = ?",
+                (username.lower(),),
+            ).fetchone()
+        if row is None:
+            return None
+        fetched_at = datetime.fromisoformat(row[2])
+        if datetime.now(timezone.utc) - fetched_at > self.ttl:
+            return None
+        return row[0], row[1], row[3], bool(row[4])
+
+    def put(self, username, display_name, bio, keywords_hash, verdict, fetched_at=None):
+        fetched_at = fetched_at or datetime.now(timezone.utc).isoformat()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO profiles "
+                "(username, display_name, bio, fetched_at, keywords_hash, verdict) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    username.lower(),
+                    display_name,
+                    bio,
+                    fetched_at,
+                    keywords_hash,
+                    int(verdict),
+                ),
+            )
+
+    def update_verdict(self, username, keywords_hash, verdict):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE profiles SET keywords_hash = ?, verdict = ? WHERE username = ?",
+                (keywords_hash, int(verdict), username.lower()),
+            )
+
+    def report(self):
+        log.info(
+            "📇 プロフィールキャッシュ: ヒット %s 件 / 取得 %s 件 (%s)",
+            self.hits,
+            self.misses,
+            self.path,
+        )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def check_profile(driver, username, display_name, keywords):
+    """
+    name/bioフィルタを判定し (判定, bio) を返す。
+    キャッシュがTTL内ならプロフィールを開かない。キーワード変更時はキャッシュ済みbioで再判定
+    """
+    if profile_cache is None:
+        bio = fetch_profile_bio(driver, username) or ""
+        return matches_name_bio(display_name, bio, keywords), bio
+
+    kw_hash = as_keyword_matcher(keywords).signature
+    cached = profile_cache.get(username)
+    if cached is not None:
+        cached_name, bio, cached_hash, verdict = cached
+        name = display_name or cached_name
+        profile_cache.hits += 1
+        run_metrics.inc("profile_cache_lookups", result="hit")
+        if cached_hash != kw_hash or name != cached_name:
+            verdict = matches_name_bio(name, bio, keywords)
+            profile_cache.update_verdict(username, kw_hash, verdict)
+        log.debug("📇 プロフィールキャッシュ使用: @%s", username)
+        return verdict, bio
+
+    profile_cache.misses += 1
+    run_metrics.inc("profile_cache_lookups", result="miss")
+    bio = fetch_profile_bio(driver, username)
+    if bio is None:
+        # 取得失敗はキャッシュせず、次回あらためて取得する
+        return matches_name_bio(display_name, "", keywords), ""
+    verdict = matches_name_bio(display_name, bio, keywords)
+    profile_cache.put(username, display_name, bio, kw_hash, verdict)
+    return verdict, bio
+
+
+def search_accounts(driver, keyword_list):
+    results = []
+    for keyword in keyword_list:
+        search_url = f"https://twitter.com/search?q={keyword}&f=user"
+        driver.get(search_url)
+        wait_for_testid(driver, ["UserCell", "emptyState"])
+
+        # ⚠ 新UI構造に対応
+        users = driver.find_elements(
+            By.XPATH, "//a[contains(@href, '/')]//div[@dir='auto']/../../.."
+        )
+        log.info("🔍 候補ユーザー件数: %s", len(users))
+
+        for user in users:
+            try:
+                spans = user.find_elements(By.XPATH, ".//span")
+                name = ""
+                username = ""
+
+                for span in spans:
+                    text = span.text.strip()
+                    if text.startswith("@"):
+                        username = text.replace("@", "")
+                    elif not name:
+                        name = text
 
                 if username and name:
                     results.append(
@@ -1036,25 +3454,33 @@ def search_accounts(driver, keyword_list):
                         }
                     )
             except Exception as e:
-                print(f"⚠️ ユーザー情報抽出失敗: {e}")
+                log.warning("⚠️ ユーザー情報抽出失敗: %s", e)
                 continue
 
     return results
 
 
+@instrumented("merge_replies_with_driver")
 def merge_replies_with_driver(driver, tweet):
+    """
+    自リプライを本文に統合する。詳細ページ訪問時に取得済み（self_replies）なら再訪問しない
+    """
     try:
-        driver.get(tweet["url"])
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located(
-                (By.XPATH, "//article[@data-testid='tweet']")
+        replies = tweet.get("self_replies")
+        if replies is None:
+            driver.get(tweet["url"])
+            WebDriverWait(driver, READINESS_TIMEOUTS["page"]).until(
+                EC.presence_of_element_located(
+                    (By.XPATH, "//article[@data-testid='tweet']")
+                )
             )
-        )
-
-        replies = extract_self_replies(driver, tweet.get("username", ""))
+            replies = extract_self_replies(driver, tweet.get("username", ""))
+        else:
+            log.debug("🧵 取得済みの自リプライを使用: %s 件", len(replies))
         if not isinstance(replies, list):
-            print(
-                f"⚠️ merge_replies_with_driver() で取得したrepliesが不正な型: {type(replies)} → 空リストに置換"
+            log.warning(
+                "⚠️ merge_replies_with_driver() で取得したrepliesが不正な型: %s → 空リストに置換",
+                type(replies),
             )
             replies = []
 
@@ -1071,8 +3497,12 @@ def merge_replies_with_driver(driver, tweet):
         for r in replies:
             reply_id = r["id"]
             reply_body = r["text"].strip()
-            clean_body = reply_body[:20].replace("\n", " ")
-            print(f"🧵 リプライ統合候補: ID={reply_id} | text先頭: {clean_body}")
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug(
+                    "🧵 リプライ統合候補: ID=%s | text先頭: %s",
+                    reply_id,
+                    reply_body[:20].replace("\n", " "),
+                )
 
             if not reply_body:
                 continue
@@ -1088,20 +3518,22 @@ def merge_replies_with_driver(driver, tweet):
             tweet["text"] = tweet_text + "\n\n" + "\n\n".join(reply_texts)
 
     except Exception as e:
-        print(f"⚠️ リプライ統合失敗（{tweet.get('url', '不明URL')}）: {e}")
+        log.warning("⚠️ リプライ統合失敗（%s）: %s", tweet.get("url", "不明URL"), e)
     return tweet
 
 
 def extract_from_search(driver, keywords, max_tweets, name_bio_keywords=None):
+    if name_bio_keywords:
+        name_bio_keywords = as_keyword_matcher(name_bio_keywords)
     tweets = []
     seen_urls = set()
     seen_users = set()
 
     for keyword in keywords:
-        print(f"🔍 話題のツイート検索中: {keyword}")
+        log.info("🔍 話題のツイート検索中: %s", keyword)
         search_url = f"https://twitter.com/search?q={keyword}&src=typed_query&f=top"
         driver.get(search_url)
-        time.sleep(3)
+        wait_for_testid(driver, ["tweet", "emptyState"])
 
         scroll_count = 0
         max_scrolls = 10
@@ -1112,7 +3544,7 @@ def extract_from_search(driver, keywords, max_tweets, name_bio_keywords=None):
         while len(tweets) < max_tweets and scroll_count < max_scrolls:
             articles = driver.find_elements(By.XPATH, "//article[@data-testid='tweet']")
             article_count = len(articles)
-            print(f"📄 表示中のツイート数: {article_count}")
+            log.debug("📄 表示中のツイート数: %s", article_count)
             for article in articles:
                 try:
                     # ツイートURLとユーザー名取得
@@ -1148,32 +3580,11 @@ def extract_from_search(driver, keywords, max_tweets, name_bio_keywords=None):
 
                     # bioフィルタがある場合はプロフィールへ先にアクセス
                     if name_bio_keywords:
-                        driver.execute_script("window.open('');")
-                        driver.switch_to.window(driver.window_handles[-1])
-                        driver.get(f"https://twitter.com/{username}")
-                        time.sleep(2)
-                        try:
-                            bio_text = (
-                                WebDriverWait(driver, 5)
-                                .until(
-                                    EC.presence_of_element_located(
-                                        (
-                                            By.XPATH,
-                                            "//div[@data-testid='UserDescription']",
-                                        )
-                                    )
-                                )
-                                .text
-                            )
-                        except:
-                            bio_text = ""
-                        driver.close()
-                        driver.switch_to.window(driver.window_handles[0])
-
-                        if not any(
-                            k in display_name for k in name_bio_keywords
-                        ) and not any(k in bio_text for k in name_bio_keywords):
-                            print(f"❌ フィルタ非一致 → スキップ: @{username}")
+                        matched, bio_text = check_profile(
+                            driver, username, display_name, name_bio_keywords
+                        )
+                        if not matched:
+                            log.debug("❌ フィルタ非一致 → スキップ: @%s", username)
                             continue
 
                     # ✅ 条件を通過した場合のみ投稿詳細ページにアクセスして抽出
@@ -1190,7 +3601,7 @@ def extract_from_search(driver, keywords, max_tweets, name_bio_keywords=None):
                         )
                         text = full_text_el.text.strip()
                     except Exception as e:
-                        print(f"⚠️ 本文取得失敗: {e}")
+                        log.warning("⚠️ 本文取得失敗: %s", e)
                         text = ""
 
                     # 投稿日時取得（安定化 + スクロール + セレクタ強化）
@@ -1207,13 +3618,15 @@ def extract_from_search(driver, keywords, max_tweets, name_bio_keywords=None):
                                 date = time_el.get_attribute("datetime")
                                 break
                         except Exception as e:
-                            print(f"⚠️ 投稿日時取得試行 {attempt+1}/5 失敗: {e}")
+                            log.warning(
+                                "⚠️ 投稿日時取得試行 %s/5 失敗: %s", attempt + 1, e
+                            )
                             time.sleep(1)
 
                     if not date:
-                        print("⚠️ 投稿日時取得に失敗 → 空文字で継続")
+                        log.warning("⚠️ 投稿日時取得に失敗 → 空文字で継続")
 
-                    # 自リプライ取得（省略可）
+                    # 自リプライ取得（main() での再訪問を避けるため結果も保持）
                     replies = extract_self_replies(driver, username)
                     if replies:
                         reply_texts = [
@@ -1229,7 +3642,7 @@ def extract_from_search(driver, keywords, max_tweets, name_bio_keywords=None):
 
                     tweet_id = re.sub(r"\D", "", tweet_url.split("/")[-1])
                     if already_registered(tweet_id):
-                        print(f"🚫 登録済 → スキップ: {tweet_url}")
+                        log.debug("🚫 登録済 → スキップ: %s", tweet_url)
                         continue
 
                     tweets.append(
@@ -1240,122 +3653,511 @@ def extract_from_search(driver, keywords, max_tweets, name_bio_keywords=None):
                             "id": tweet_id,
                             "username": username,
                             "display_name": display_name,
+                            "self_replies": replies,
                         }
                     )
 
-                    print(f"✅ 収集: {tweet_url} @{username}")
-                    if len(tweets) >= max_tweets:
-                        break
+                    log.info("✅ 収集: %s @%s", tweet_url, username)
+                    if len(tweets) >= max_tweets:
+                        break
+
+                except Exception as e:
+                    log.warning("⚠️ 投稿抽出エラー: %s", e)
+                    continue
+
+            # スクロール実行
+            for _ in range(3):
+                baseline = article_mutation_count(driver)
+                driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+                wait_for_article_change(
+                    driver, baseline, READINESS_TIMEOUTS["search_scroll"]
+                )
+
+            # 読み込み判定
+            if article_count == last_article_count:
+                pause_counter += 1
+                log.debug("🧊 スクロール後に新しい投稿なし")
+                if pause_counter >= pause_threshold:
+                    log.info("🛑 投稿が増えないため中断")
+                    break
+            else:
+                pause_counter = 0
+
+            last_article_count = article_count
+            scroll_count += 1
+
+    return tweets
+
+
+GRAPHQL_OPERATIONS = ("UserTweets", "TweetDetail", "SearchTimeline")
+
+
+def graphql_operation_name(url):
+    m = re.search(r"/graphql/[^/]+/(\w+)", url or "")
+    return m.group(1) if m else None
+
+
+class GraphQLCapture:
+    """
+    Chromeのパフォーマンスログから X の GraphQL レスポンス本文を回収する。
+    responseReceived でリクエストIDを控え、loadingFinished 後に Network.getResponseBody で本文を取得する。
+    """
+
+    def __init__(self, driver, operations=GRAPHQL_OPERATIONS):
+        self.driver = driver
+        self.operations = operations
+        self._pending = {}
+
+    def reset(self):
+        """ページ遷移前に、それまでのログを読み捨てる"""
+        self.driver.get_log("performance")
+        self._pending.clear()
+
+    def poll(self):
+        """前回以降に完了したレスポンスを (操作名, JSON) のリストで返す"""
+        payloads = []
+        for entry in self.driver.get_log("performance"):
+            try:
+                message = json.loads(entry["message"])["message"]
+            except Exception:
+                continue
+            method = message.get("method")
+            params = message.get("params", {})
+            if method == "Network.responseReceived":
+                operation = graphql_operation_name(
+                    params.get("response", {}).get("url")
+                )
+                if operation in self.operations:
+                    self._pending[params.get("requestId")] = operation
+            elif method == "Network.loadingFinished":
+                operation = self._pending.pop(params.get("requestId"), None)
+                if not operation:
+                    continue
+                try:
+                    result = self.driver.execute_cdp_cmd(
+                        "Network.getResponseBody", {"requestId": params["requestId"]}
+                    )
+                    body = result.get("body", "")
+                    if result.get("base64Encoded"):
+                        body = base64.b64decode(body).decode("utf-8")
+                    payloads.append((operation, json.loads(body)))
+                except Exception as e:
+                    log.warning("⚠️ GraphQLレスポンス取得失敗（%s）: %s", operation, e)
+        return payloads
+
+
+def iter_graphql_tweet_objects(node):
+    """
+    GraphQLレスポンス内のTweetオブジェクトを出現順に返す。
+    引用元・RT元（quoted_status_result / retweeted_status_result）には潜らない。
+    """
+    if isinstance(node, dict):
+        if node.get("rest_id") and isinstance(node.get("legacy"), dict):
+            if "full_text" in node["legacy"]:
+                yield node
+                return
+        for value in node.values():
+            yield from iter_graphql_tweet_objects(value)
+    elif isinstance(node, list):
+        for value in node:
+            yield from iter_graphql_tweet_objects(value)
+
+
+def _graphql_user(tweet_obj):
+    user = tweet_obj.get("core", {}).get("user_results", {}).get("result", {})
+    legacy = user.get("legacy", {})
+    core = user.get("core", {})
+    return {
+        "username": core.get("screen_name") or legacy.get("screen_name") or "",
+        "display_name": core.get("name") or legacy.get("name") or "",
+        "description": legacy.get("description")
+        or user.get("profile_bio", {}).get("description")
+        or "",
+    }
+
+
+def _graphql_text(tweet_obj):
+    note = (
+        tweet_obj.get("note_tweet", {})
+        .get("note_tweet_results", {})
+        .get("result", {})
+        .get("text")
+    )
+    if note:
+        return note.strip()
+    legacy = tweet_obj["legacy"]
+    text = legacy.get("full_text", "")
+    display_range = legacy.get("display_text_range")
+    if display_range and len(display_range) == 2:
+        text = text[display_range[0] : display_range[1]]
+    return text.strip()
+
+
+def _graphql_date(created_at):
+    try:
+        return datetime.strptime(created_at, "%a %b %d %H:%M:%S %z %Y").strftime(
+            "%Y-%m-%dT%H:%M:%S.000Z"
+        )
+    except (TypeError, ValueError):
+        return None
+
+
+def graphql_tweet_to_dict(tweet_obj):
+    """
+    GraphQLのTweetオブジェクトを extract_thread_from_detail_page と同じ形のdictに変換する。
+    数値は「万」表記に丸められていない正確な値。
+    """
+    if tweet_obj.get("__typename") == "TweetWithVisibilityResults":
+        tweet_obj = tweet_obj.get("tweet", tweet_obj)
+    legacy = tweet_obj["legacy"]
+    user = _graphql_user(tweet_obj)
+    tweet_id = tweet_obj["rest_id"]
+
+    images = []
+    poster_url = None
+    for media in legacy.get("extended_entities", {}).get("media", []):
+        if media.get("type") == "photo":
+            images.append(media.get("media_url_https"))
+        elif poster_url is None:
+            # video / animated_gif はサムネイルを poster として扱う
+            poster_url = media.get("media_url_https")
+
+    views = tweet_obj.get("views", {}).get("count")
+    return {
+        "url": f"https://x.com/{user['username']}/status/{tweet_id}",
+        "id": tweet_id,
+        "text": _graphql_text(tweet_obj),
+        "date": _graphql_date(legacy.get("created_at")),
+        "images": [url for url in images if url],
+        "username": user["username"],
+        "display_name": user["display_name"],
+        "user_description": user["description"],
+        "impressions": int(views) if views is not None else None,
+        "retweets": legacy.get("retweet_count", 0),
+        "likes": legacy.get("favorite_count", 0),
+        "bookmarks": legacy.get("bookmark_count", 0),
+        "replies": legacy.get("reply_count", 0),
+        "article": None,
+        "video_poster": None,
+        "video_poster_url": poster_url,
+        "in_reply_to_id": legacy.get("in_reply_to_status_id_str"),
+        "conversation_id": legacy.get("conversation_id_str"),
+        "is_quote": bool(legacy.get("is_quote_status")),
+        "is_retweet": "retweeted_status_result" in legacy,
+    }
+
+
+def parse_graphql_tweets(payload):
+    """
+    UserTweets / TweetDetail / SearchTimeline のレスポンスJSONから投稿dictのリストを作る
+    """
+    tweets = []
+    seen_ids = set()
+    for tweet_obj in iter_graphql_tweet_objects(payload):
+        try:
+            tweet = graphql_tweet_to_dict(tweet_obj)
+        except Exception as e:
+            log.warning("⚠️ GraphQL投稿変換失敗: %s - %s", type(e).__name__, e)
+            continue
+        if tweet["id"] in seen_ids:
+            continue
+        seen_ids.add(tweet["id"])
+        tweets.append(tweet)
+    return tweets
+
+
+def is_graphql_parent_post(tweet):
+    """
+    DOM版の is_reply_structure / 親投稿判定に相当する判定をGraphQLのフィールドで行う
+    """
+    if tweet["is_retweet"]:
+        log.debug("↪️ リポストのためスキップ: %s", tweet["url"])
+        return False
+    if tweet["in_reply_to_id"]:
+        log.debug("↪️ リプライのためスキップ: %s", tweet["url"])
+        return False
+    if tweet["is_quote"]:
+        has_media = bool(tweet["images"] or tweet["video_poster_url"])
+        if not (has_media and len(tweet["text"]) >= 50):
+            log.debug("↪️ 引用（条件未満）のためスキップ: %s", tweet["url"])
+            return False
+    return True
+
+
+def scroll_and_capture(driver, capture, handle, max_scrolls):
+    """
+    スクロールしながらGraphQLレスポンスを回収し、投稿ごとに handle(tweet) を呼ぶ。
+    handle が True を返したら終了。新しい投稿が来なくなっても終了。
+    """
+    seen_ids = set()
+    pause_counter = 0
+    for scroll_count in range(max_scrolls):
+        before = len(seen_ids)
+        for operation, payload in capture.poll():
+            for tweet in parse_graphql_tweets(payload):
+                if tweet["id"] in seen_ids:
+                    continue
+                seen_ids.add(tweet["id"])
+                if handle(tweet):
+                    return
+
+        if len(seen_ids) == before:
+            pause_counter += 1
+            log.debug("🧊 新規投稿なし → pause_counter=%s", pause_counter)
+            if pause_counter >= 3:
+                log.info("🛑 新しい投稿が検出されないため中断")
+                return
+        else:
+            pause_counter = 0
+
+        for _ in range(3):
+            baseline = article_mutation_count(driver)
+            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+            wait_for_article_change(driver, baseline, READINESS_TIMEOUTS["scroll"])
+        wait_for_network_idle(driver)
+
+
+@instrumented("extract_tweets_graphql")
+def extract_tweets_graphql(driver, extract_target, max_tweets):
+    """
+    UserTweets のレスポンスから投稿を組み立てる（詳細ページへのアクセス不要）
+    """
+    log.info("✨ アクセス中（GraphQL取得）: https://twitter.com/%s", extract_target)
+    capture = GraphQLCapture(driver, ("UserTweets",))
+    capture.reset()
+    driver.get(f"https://twitter.com/{extract_target}")
+    wait_for_testid(driver, ["tweet", "emptyState"])
+    wait_for_network_idle(driver)
+
+    tweets = []
 
-                except Exception as e:
-                    print(f"⚠️ 投稿抽出エラー: {e}")
-                    continue
+    def handle(tweet):
+        if tweet["username"].lower() != extract_target.lower():
+            return False
+        if not is_graphql_parent_post(tweet):
+            return False
+        if is_ad_post(tweet["text"]):
+            log.debug("🚫 広告と判定→スキップ: %s", tweet["url"])
+            return False
+        if already_registered(tweet["id"]):
+            log.debug("❌ 登録済→スキップ: %s", tweet["url"])
+            return False
+        tweets.append(tweet)
+        log.info(
+            "✅ 抽出: %s（いいね=%s 表示=%s）",
+            tweet["url"],
+            tweet["likes"],
+            tweet["impressions"],
+        )
+        return len(tweets) >= max_tweets
 
-            # スクロール実行
-            for _ in range(3):
-                driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(2)
+    scroll_and_capture(driver, capture, handle, max_scrolls=50)
+    tweets.sort(key=lambda x: int(x["id"]))
+    log.info("📈 取得完了 → 合計投稿数: %s 件", len(tweets))
+    return tweets
 
-            # 読み込み判定
-            if article_count == last_article_count:
-                pause_counter += 1
-                print("🧊 スクロール後に新しい投稿なし")
-                if pause_counter >= pause_threshold:
-                    print("🛑 投稿が増えないため中断")
-                    break
-            else:
-                pause_counter = 0
 
-            last_article_count = article_count
-            scroll_count += 1
+def extract_from_search_graphql(driver, keywords, max_tweets, name_bio_keywords=None):
+    """
+    SearchTimeline のレスポンスから投稿を集める。
+    レスポンスに名前・bioが含まれるため、name/bioフィルタにプロフィールを開く必要がない。
+    """
+    if name_bio_keywords:
+        name_bio_keywords = as_keyword_matcher(name_bio_keywords)
+    tweets = []
+    seen_users = set()
+    capture = GraphQLCapture(driver, ("SearchTimeline",))
+
+    for keyword in keywords:
+        if len(tweets) >= max_tweets:
+            break
+        log.info("🔍 話題のツイート検索中（GraphQL取得）: %s", keyword)
+        capture.reset()
+        driver.get(f"https://twitter.com/search?q={keyword}&src=typed_query&f=top")
+        wait_for_testid(driver, ["tweet", "emptyState"])
+        wait_for_network_idle(driver)
+
+        def handle(tweet):
+            username = tweet["username"]
+            if not username or username in seen_users:
+                return False
+            seen_users.add(username)
+            if name_bio_keywords and not matches_name_bio(
+                tweet["display_name"], tweet["user_description"], name_bio_keywords
+            ):
+                log.debug("❌ フィルタ非一致 → スキップ: @%s", username)
+                return False
+            if already_registered(tweet["id"]):
+                log.debug("🚫 登録済 → スキップ: %s", tweet["url"])
+                return False
+            tweets.append(tweet)
+            log.info("✅ 収集: %s @%s", tweet["url"], username)
+            return len(tweets) >= max_tweets
+
+        scroll_and_capture(driver, capture, handle, max_scrolls=10)
 
     return tweets
 
 
-def main():
-    parser = argparse.ArgumentParser()
-    parser.add_argument("--config", default="config.json", help="設定ファイル（JSON）")
-    parser.add_argument(
-        "--account", default="accounts.json", help="アカウントファイル（JSON）"
-    )
-    args = parser.parse_args()
+def select_target(config):
+    """このスレッドで処理中の対象アカウント（自リプライ判定に使う）を設定する"""
+    worker_state.extract_target = config.get("extract_target")
 
-    config = load_config(args.config)
-    account = load_config(args.account)
 
-    global NOTION_TOKEN, DATABASE_ID, notion
+def apply_config(config, account):
+    global NOTION_TOKEN, DATABASE_ID, EXTRACT_TARGET, MAX_TWEETS
     global TWITTER_EMAIL, TWITTER_USERNAME, TWITTER_PASSWORD
-    global EXTRACT_TARGET, MAX_TWEETS
+    global TIMELINE_ENGINE, DETAIL_PARSER, DETAIL_WORKERS, SAVE_MEDIA_FILES
+    global media_fetcher, CAPTURE_BACKEND, BROWSER_PROFILE, USER_DATA_DIR
+    global INCREMENTAL_CRAWL, HIGH_WATER_OVERLAP, METRICS_PATH
 
     NOTION_TOKEN = config["notion_token"]
     DATABASE_ID = config["database_id"]
-    EXTRACT_TARGET = config["extract_target"]
+    EXTRACT_TARGET = config.get("extract_target")
     MAX_TWEETS = config["max_tweets"]
+    READINESS_TIMEOUTS.update(config.get("readiness_timeouts", {}))
+    CAPTURE_BACKEND = config.get("capture_backend", CAPTURE_BACKEND)
+    BROWSER_PROFILE = config.get("browser_profile", BROWSER_PROFILE)
+    USER_DATA_DIR = config.get("user_data_dir", USER_DATA_DIR)
+    TIMELINE_ENGINE = config.get("timeline_engine", TIMELINE_ENGINE)
+    DETAIL_PARSER = config.get("detail_parser", DETAIL_PARSER)
+    DETAIL_WORKERS = int(config.get("detail_workers", DETAIL_WORKERS))
+    SAVE_MEDIA_FILES = bool(config.get("save_media_files", SAVE_MEDIA_FILES))
+    METRICS_PATH = config.get("metrics_path", METRICS_PATH)
+    INCREMENTAL_CRAWL = bool(config.get("incremental_crawl", INCREMENTAL_CRAWL))
+    HIGH_WATER_OVERLAP = int(config.get("high_water_overlap", HIGH_WATER_OVERLAP))
+    media_fetcher = MediaFetcher(
+        workers=int(config.get("media_fetch_workers", MEDIA_FETCH_WORKERS)),
+        timeout=float(config.get("media_timeout", MEDIA_TIMEOUT)),
+        retries=int(config.get("media_retries", MEDIA_RETRIES)),
+    )
+
+    build_keyword_matchers(config)
 
     TWITTER_EMAIL = account["email"]
     TWITTER_USERNAME = account["username"]
     TWITTER_PASSWORD = account["password"]
 
+
+def open_stores(config, resume=False, use_journal=True):
+    global notion, registered_index, ocr_cache, profile_cache, crawl_journal
+
     notion = Client(auth=NOTION_TOKEN)
-    driver = setup_driver()
+    registered_index = load_registered_index(
+        config.get("registered_index_path", REGISTERED_INDEX_PATH)
+    )
+    ocr_cache = OcrCache(
+        config.get("ocr_cache_path", OCR_CACHE_PATH),
+        max_entries=int(config.get("ocr_cache_max_entries", OCR_CACHE_MAX_ENTRIES)),
+        use_phash=bool(config.get("ocr_cache_phash", False)),
+    )
+    profile_cache = ProfileCache(
+        config.get("profile_cache_path", PROFILE_CACHE_PATH),
+        ttl_hours=float(config.get("profile_cache_ttl_hours", PROFILE_CACHE_TTL_HOURS)),
+    )
+    # ワークキューで動かす場合は中断・再開をキュー側が受け持つため、ジャーナルは使わない
+    if use_journal:
+        crawl_journal = load_crawl_journal(
+            config.get("crawl_journal_path", CRAWL_JOURNAL_PATH), resume=resume
+        )
+
+
+def close_stores():
+    ocr_cache.report()
+    media_fetcher.close()
+    if crawl_journal is not None:
+        crawl_journal.close()
+    profile_cache.report()
+    profile_cache.close()
+
+
+def start_browsers(target=None, worker=0):
+    """
+    メインのブラウザを起動してログインし、詳細ページ用のブラウザも揃える。
+    worker: 複数対象を並列処理する際のワーカー番号（0以外は呼び出したスレッド専用のブラウザになる）
+    """
+    global detail_drivers
+    first_index = worker * DETAIL_WORKERS
+    driver = setup_driver(worker_index=first_index)
+    login(driver, target)
+    drivers = setup_detail_drivers(driver, DETAIL_WORKERS, index_offset=first_index)
+    worker_state.detail_drivers = drivers
+    if worker == 0:
+        detail_drivers = drivers
+    return driver
+
+
+def stop_browsers(driver):
+    quit_detail_drivers(driver)
+    driver.quit()
+
 
-    login(driver, EXTRACT_TARGET if config["mode"] == "target_only" else None)
+# ✅ 安全マージンをもって URL を多めに収集（対象外の投稿を除いても max_tweets 件に届くように）
+URL_BUFFER_FACTOR = 3
 
+
+def collect_tweets(driver, config):
+    """config["mode"] に従って投稿を収集する"""
+    extract_target = config.get("extract_target")
+    max_tweets = config["max_tweets"]
     if config["mode"] == "target_only":
-        print(
-            f"🎯 mode: target_only → extract_target = {EXTRACT_TARGET} の投稿を取得します"
+        log.info(
+            "🎯 mode: target_only → extract_target = %s の投稿を取得します",
+            extract_target,
         )
 
-        # ✅ 安全マージンをもって URL を多めに収集
-        URL_BUFFER_FACTOR = 3
-        tweet_dicts = extract_tweets(
-            driver, EXTRACT_TARGET, MAX_TWEETS * URL_BUFFER_FACTOR
-        )
-        tweet_urls = [t["url"] for t in tweet_dicts if "url" in t]
+        if CAPTURE_BACKEND == "graphql":
+            tweets = extract_tweets_graphql(driver, extract_target, max_tweets)
+        else:
+            tweet_urls = discover_tweet_urls(
+                driver, extract_target, max_tweets * URL_BUFFER_FACTOR
+            )
 
-        # ✅ 実際に登録成功した件数が MAX_TWEETS に達するまで処理
-        tweets = extract_and_merge_tweets(driver, tweet_urls, MAX_TWEETS)
+            # ✅ 実際に登録成功した件数が MAX_TWEETS に達するまで処理
+            tweets = extract_and_merge_tweets(driver, tweet_urls, max_tweets)
+            tag_timeline_account(tweets, extract_target, max_tweets, tweet_urls)
 
     elif config["mode"] == "search_filtered":
-        print(
+        log.info(
             "🔍 mode: search_filtered → 検索 + name/bio + tweetフィルタをかけて投稿を収集します"
         )
         users = search_accounts(driver, config["filter_keywords_name_bio"])
         tweets = []
         for user in users:
             if is_recruit_account(user["name"], user["bio"], config):
-                user_tweets = extract_tweets(driver, user["username"], MAX_TWEETS)
+                user_tweets = extract_tweets(driver, user["username"], max_tweets)
                 tweets.extend(
                     [t for t in user_tweets if is_recruit_post(t["text"], config)]
                 )
 
     elif config["mode"] == "search_all":
-        print("🌐 mode: search_all → ユーザー検索 → bioフィルタ → 各ユーザーの投稿取得")
+        log.info(
+            "🌐 mode: search_all → ユーザー検索 → bioフィルタ → 各ユーザーの投稿取得"
+        )
         tweets = []
-        remaining = MAX_TWEETS
+        remaining = max_tweets
 
         for keyword in config["filter_keywords_tweet"]:
             search_url = f"https://twitter.com/search?q={keyword}&f=user"
             driver.get(search_url)
-            time.sleep(3)
 
             try:
-                WebDriverWait(driver, 10).until(
+                WebDriverWait(driver, READINESS_TIMEOUTS["page"]).until(
                     EC.presence_of_all_elements_located(
                         (By.XPATH, "//button[@data-testid='UserCell']")
                     )
                 )
             except:
-                print("⚠️ UserCellが一定時間以内に見つかりませんでした")
+                log.warning("⚠️ UserCellが一定時間以内に見つかりませんでした")
 
             user_elements = driver.find_elements(
                 By.XPATH, "//button[@data-testid='UserCell']"
             )
-            print(f"📄 検出ユーザー数: {len(user_elements)}")
+            log.info("📄 検出ユーザー数: %s", len(user_elements))
 
             for user_el in user_elements:
                 if remaining <= 0:
-                    print("🎯 最大件数に達したため終了")
+                    log.info("🎯 最大件数に達したため終了")
                     break
 
                 try:
@@ -1371,48 +4173,40 @@ def main():
                     if not username:
                         continue
 
-                    driver.execute_script("window.open('');")
-                    driver.switch_to.window(driver.window_handles[-1])
-                    driver.get(f"https://twitter.com/{username}")
-                    time.sleep(2)
-
-                    try:
-                        bio = (
-                            WebDriverWait(driver, 5)
-                            .until(
-                                EC.presence_of_element_located(
-                                    (By.XPATH, "//div[@data-testid='UserDescription']")
-                                )
-                            )
-                            .text
-                        )
-                    except:
-                        bio = ""
-
-                    driver.close()
-                    driver.switch_to.window(driver.window_handles[0])
-
-                    bio_keywords = config["filter_keywords_name_bio"]
-                    if not any(k in name for k in bio_keywords) and not any(
-                        k in bio for k in bio_keywords
-                    ):
+                    matched, bio = check_profile(
+                        driver,
+                        username,
+                        name,
+                        get_keyword_matcher(config, "filter_keywords_name_bio"),
+                    )
+                    if not matched:
                         continue
 
-                    print(
-                        f"✅ 抽出対象ユーザー → @{username} | name: '{name}' | bio: '{bio}'"
+                    log.info(
+                        "✅ 抽出対象ユーザー → @%s | name: '%s' | bio: '%s'",
+                        username,
+                        name,
+                        bio,
                     )
 
-                    tweet_dicts = extract_tweets(driver, username, remaining)
-                    tweet_urls = [t["url"] for t in tweet_dicts if "url" in t]
-                    tweets_for_user = extract_and_merge_tweets(
-                        driver, tweet_urls, remaining
-                    )
+                    if CAPTURE_BACKEND == "graphql":
+                        tweets_for_user = extract_tweets_graphql(
+                            driver, username, remaining
+                        )
+                    else:
+                        tweet_urls = discover_tweet_urls(driver, username, remaining)
+                        tweets_for_user = extract_and_merge_tweets(
+                            driver, tweet_urls, remaining
+                        )
+                        tag_timeline_account(
+                            tweets_for_user, username, remaining, tweet_urls
+                        )
 
                     tweets.extend(tweets_for_user)
                     remaining -= len(tweets_for_user)
 
                 except Exception as e:
-                    print(f"⚠️ ユーザー単位処理エラー: {e}")
+                    log.warning("⚠️ ユーザー単位処理エラー: %s", e)
                     try:
                         driver.close()
                         driver.switch_to.window(driver.window_handles[0])
@@ -1421,33 +4215,882 @@ def main():
                     continue
 
     elif config["mode"] == "keyword_trend":
-        print("🔥 mode: keyword_trend → 指定キーワードで話題投稿を収集します")
-        tweets = extract_from_search(
+        log.info("🔥 mode: keyword_trend → 指定キーワードで話題投稿を収集します")
+        search = (
+            extract_from_search_graphql
+            if CAPTURE_BACKEND == "graphql"
+            else extract_from_search
+        )
+        tweets = search(
             driver,
             config["filter_keywords_tweet"],
-            MAX_TWEETS,
-            config.get("filter_keywords_name_bio"),
+            max_tweets,
+            get_keyword_matcher(config, "filter_keywords_name_bio"),
         )
 
     else:
         raise ValueError(f"❌ 未知のmode指定です: {config['mode']}")
 
-    # 投稿収集と整合性保証付き登録処理
-    print(f"\n📊 取得ツイート数: {len(tweets)} 件")
+    log.info("📊 取得ツイート数: %s 件", len(tweets))
+    return tweets
+
 
-    # ✅ 投稿ID昇順で並べ替えてから登録（順番保証）
+def process_tweets(driver, tweets, ocr_stage, uploader, resume=False):
+    """リプライ統合・OCRを済ませた投稿を uploader に渡し、処理件数を返す"""
+    # ✅ 投稿ID昇順で並べ替えてから登録（順番保証。notion_upload_workers を2以上にした場合は順不同）
     tweets.sort(key=lambda x: int(x["id"]))
 
+    # 再開時: 登録済みの投稿は除外し、OCR済みの投稿は前回の結果を使う
+    if resume:
+        tweets = [t for t in tweets if not crawl_journal.is_uploaded(t["id"])]
+        for tweet in tweets:
+            ocr_texts = crawl_journal.load_ocr(tweet["id"])
+            if ocr_texts is not None:
+                tweet["ocr_texts"] = ocr_texts
+
+    # OCRは別プロセスで先に走らせ、その間にブラウザでリプライ統合を進める
+    ocr_stage.submit_batch([t for t in tweets if "ocr_texts" not in t])
+
     for i, tweet in enumerate(tweets, 1):
-        print(f"\n🌀 {i}/{len(tweets)} 件目 処理中...")
-        tweet_for_print = tweet.copy()
-        tweet_for_print.pop("article", None)
-        print(json.dumps(tweet_for_print, ensure_ascii=False, indent=2))
+        log.info("🌀 %s/%s 件目 処理中...", i, len(tweets))
+        if log.isEnabledFor(logging.DEBUG):
+            tweet_for_print = tweet.copy()
+            tweet_for_print.pop("article", None)
+            log.debug("%s", json.dumps(tweet_for_print, ensure_ascii=False))
         tweet = merge_replies_with_driver(driver, tweet)
-        upload_to_notion(tweet)
+        if "ocr_texts" not in tweet:
+            tweet["ocr_texts"] = ocr_stage.collect(tweet)
+            crawl_journal.record_ocr(tweet["id"], tweet["ocr_texts"])
+        uploader.submit(tweet)
 
-    driver.quit()
-    print("✅ 全投稿の処理完了")
+    run_metrics.inc("tweets_processed", len(tweets))
+    return len(tweets)
+
+
+# 複数対象の一括処理: targets を target_workers 台のブラウザ（ワーカー）で分担する
+TARGET_WORKERS = 1
+claimed_tweet_ids = set()
+claimed_lock = threading.Lock()
+
+
+def expand_targets(config, targets, **defaults):
+    """
+    対象一覧の各要素（アカウント名の文字列、または extract_target / mode / max_tweets 等の辞書）を
+    config に重ねる。一覧が空ならトップレベルの extract_target / mode の1件
+    """
+    expanded = []
+    for target in targets or [{}]:
+        if isinstance(target, str):
+            target = {"extract_target": target}
+        merged = {**config, **defaults, **target}
+        if merged["mode"] == "target_only" and not merged.get("extract_target"):
+            raise ValueError(
+                f"❌ target_only の対象に extract_target がありません: {target}"
+            )
+        expanded.append(merged)
+    return expanded
+
+
+def claim_tweets(tweets):
+    """複数の対象で同じ投稿が見つかった場合に、最初の1件だけを処理対象にする"""
+    with claimed_lock:
+        fresh = [t for t in tweets if t["id"] not in claimed_tweet_ids]
+        claimed_tweet_ids.update(t["id"] for t in fresh)
+    return fresh
+
+
+def batch_worker(worker, driver, pending, ocr_stage, uploader, resume, totals):
+    """
+    pending から対象を取り出して収集・登録を繰り返す。
+    driver が None なら自分用のブラウザを起動する（ログインは共有のCookieで済む）
+    """
+    if driver is None:
+        try:
+            driver = start_browsers(worker=worker)
+        except Exception as e:
+            log.warning("⚠️ ワーカー%s のブラウザ起動失敗: %s", worker + 1, e)
+            return
+    try:
+        while True:
+            try:
+                target = pending.get_nowait()
+            except queue.Empty:
+                return
+            select_target(target)
+            log.info("🧵 ワーカー%s: %s の処理開始", worker + 1, target_label(target))
+            try:
+                tweets = claim_tweets(collect_tweets(driver, target))
+                count = process_tweets(
+                    driver, tweets, ocr_stage, uploader, resume=resume
+                )
+                totals[target_label(target)] = count
+            except Exception as e:
+                log.warning("⚠️ %s の処理失敗: %s", target_label(target), e)
+                run_metrics.inc("target_errors", target=target_label(target))
+                if pending.empty():
+                    return
+                try:
+                    driver = restart_browsers(driver, "error", worker=worker)
+                except Exception as e:
+                    # 残りの対象は他のワーカーが引き継ぐ
+                    log.warning("⚠️ ワーカー%s のブラウザ再起動失敗: %s", worker + 1, e)
+                    driver = None
+                    return
+    finally:
+        if driver is not None:
+            stop_browsers(driver)
+
+
+def run_batch(config, ocr_stage, uploader, resume=False):
+    """
+    targets の全対象を1回の実行で処理する。ログインは最初のブラウザで1回だけ行い、
+    残りのワーカーは保存されたCookieを注入して同じセッションを使う。
+    登録済みID索引・OCR・Notion登録は全ワーカーで共有する
+    """
+    targets = expand_targets(config, config.get("targets"))
+    workers = max(
+        1, min(int(config.get("target_workers", TARGET_WORKERS)), len(targets))
+    )
+    pending = queue.Queue()
+    for target in targets:
+        pending.put(target)
+    first = targets[0]
+    driver = start_browsers(
+        first["extract_target"] if first["mode"] == "target_only" else None
+    )
+    if len(targets) > 1:
+        log.info("📋 %s 件の対象を %s 台のワーカーで処理", len(targets), workers)
+    totals = {}
+    threads = [
+        threading.Thread(
+            target=batch_worker,
+            args=(w, None, pending, ocr_stage, uploader, resume, totals),
+        )
+        for w in range(1, workers)
+    ]
+    for t in threads:
+        t.start()
+    batch_worker(0, driver, pending, ocr_stage, uploader, resume, totals)
+    for t in threads:
+        t.join()
+    if len(targets) > 1:
+        for label, count in totals.items():
+            log.info("📊 %s: %s 件", label, count)
+    return sum(totals.values())
+
+
+# 常駐モード（--daemon）: ブラウザを起動したまま対象を定期巡回する
+DAEMON_INTERVAL_MINUTES = 5
+DAEMON_JITTER = 0.2  # 巡回間隔を ±20% ずらして毎回同じ時刻にアクセスしない
+DAEMON_RECYCLE_PAGES = 300
+DAEMON_RECYCLE_MEMORY_MB = 2048
+DAEMON_FULL_SYNC_HOURS = 24  # Notion側で削除された登録済みIDを取り除く全件同期の間隔
+stop_requested = threading.Event()
+
+
+def handle_stop_signals():
+    """SIGINT / SIGTERM で stop_requested を立て、処理中の単位を終えてから止まれるようにする"""
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop_requested.set())
+
+
+def daemon_targets(config):
+    """
+    daemon_targets（未指定なら targets）の各要素に interval_minutes を加えた巡回対象の一覧
+    """
+    interval = float(config.get("daemon_interval_minutes", DAEMON_INTERVAL_MINUTES))
+    return expand_targets(
+        config,
+        config.get("daemon_targets") or config.get("targets"),
+        interval_minutes=interval,
+    )
+
+
+def target_label(config):
+    if config["mode"] == "target_only":
+        return f"@{config['extract_target']}"
+    return config["mode"]
+
+
+def next_poll_delay(interval_minutes, jitter=DAEMON_JITTER):
+    return interval_minutes * 60 * (1 + random.uniform(-jitter, jitter))
+
+
+def process_tree_rss_mb(root_pid):
+    """/proc から root_pid と子孫プロセスのRSS合計（MB）を返す。/proc がない環境では None"""
+    if not os.path.isdir("/proc"):
+        return None
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "r") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # プロセス名に空白や括弧が入り得るため、最後の ')' より後ろを分割する
+        ppid = int(stat.rsplit(")", 1)[1].split()[1])
+        children.setdefault(ppid, []).append(int(entry))
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    total = 0
+    pending = [root_pid]
+    while pending:
+        pid = pending.pop()
+        try:
+            with open(f"/proc/{pid}/statm", "r") as f:
+                total += int(f.read().split()[1]) * page_size
+        except OSError:
+            pass
+        pending.extend(children.get(pid, []))
+    return total / (1024 * 1024)
+
+
+def browser_rss_mb(driver):
+    """chromedriver 配下（Chrome本体・レンダラー含む）のRSS合計"""
+    process = getattr(getattr(driver, "service", None), "process", None)
+    if process is None:
+        return None
+    return process_tree_rss_mb(process.pid)
+
+
+def browser_recycle_reason(drivers, max_pages, max_memory_mb):
+    """ブラウザを起動し直すべきなら理由（"pages" / "memory"）、不要なら None"""
+    pages = sum(getattr(d, "page_loads", 0) for d in drivers)
+    if max_pages and pages >= max_pages:
+        log.info("📄 ページ読み込み %s 回（上限 %s）", pages, max_pages)
+        return "pages"
+    if max_memory_mb:
+        rss = sum(browser_rss_mb(d) or 0 for d in drivers)
+        log.debug("🧠 ブラウザのメモリ使用量: %.0f MB", rss)
+        if rss >= max_memory_mb:
+            log.info(
+                "🧠 ブラウザのメモリ使用量 %.0f MB（上限 %s MB）", rss, max_memory_mb
+            )
+            return "memory"
+    return None
+
+
+def restart_browsers(driver, reason, worker=0):
+    log.info("♻️ ブラウザを起動し直します（%s）", reason)
+    run_metrics.inc("browser_recycles", reason=reason)
+    try:
+        stop_browsers(driver)
+    except Exception as e:
+        log.warning("⚠️ ブラウザ終了失敗: %s", e)
+    return start_browsers(worker=worker)
+
+
+def poll_target(driver, config, ocr_stage, uploader, resume=False):
+    select_target(config)
+    started = time.monotonic()
+    tweets = collect_tweets(driver, config)
+    count = process_tweets(driver, tweets, ocr_stage, uploader, resume=resume)
+    # 次の巡回の既登録判定に今回の登録結果を反映させる
+    uploader.flush()
+    run_metrics.inc("daemon_polls", target=target_label(config))
+    log.info(
+        "🛰️ %s の巡回完了: %s 件 (%.1f秒)",
+        target_label(config),
+        count,
+        time.monotonic() - started,
+    )
+
+
+def run_daemon(config, ocr_stage, uploader, resume=False):
+    """
+    ログイン済みのブラウザを起動したまま、対象ごとの間隔（±jitter）で巡回し続ける。
+    Notionクライアント・登録済みID索引・各キャッシュ・キーワード判定器は巡回をまたいで使い回し、
+    ブラウザはページ読み込み数かメモリ使用量が上限に達したときだけ起動し直す。
+    SIGINT / SIGTERM を受けると実行中の巡回を終えてから戻る。
+    """
+    jitter = float(config.get("daemon_jitter", DAEMON_JITTER))
+    max_pages = int(config.get("daemon_recycle_pages", DAEMON_RECYCLE_PAGES))
+    max_memory_mb = float(
+        config.get("daemon_recycle_memory_mb", DAEMON_RECYCLE_MEMORY_MB)
+    )
+    full_sync_seconds = (
+        float(config.get("daemon_full_sync_hours", DAEMON_FULL_SYNC_HOURS)) * 3600
+    )
+    targets = daemon_targets(config)
+    handle_stop_signals()
+
+    due = [time.monotonic()] * len(targets)
+    last_full_sync = time.monotonic()  # 起動時の同期（open_stores）を起点にする
+    driver = start_browsers()
+    log.info("🛰️ 常駐モード開始: %s 件の対象を巡回", len(targets))
+    try:
+        while not stop_requested.is_set():
+            i = min(range(len(targets)), key=due.__getitem__)
+            if stop_requested.wait(max(0.0, due[i] - time.monotonic())):
+                break
+            target = targets[i]
+            # 巡回ごとに新しいジャーナルで始める（--resume 時の最初の巡回のみ前回の続き）
+            if not resume:
+                crawl_journal.reset()
+            # 他の書き込み元によるNotion側の追加は差分同期で、削除は定期的な全件同期で取り込む
+            if registered_index is not None:
+                full = (
+                    full_sync_seconds > 0
+                    and time.monotonic() - last_full_sync >= full_sync_seconds
+                )
+                sync_registered_index(registered_index, full=full)
+                if full:
+                    last_full_sync = time.monotonic()
+            try:
+                poll_target(driver, target, ocr_stage, uploader, resume=resume)
+            except Exception as e:
+                log.warning("⚠️ %s の巡回失敗: %s", target_label(target), e)
+                run_metrics.inc("daemon_poll_errors", target=target_label(target))
+                reason = "error"
+            else:
+                reason = browser_recycle_reason(
+                    current_detail_drivers(), max_pages, max_memory_mb
+                )
+            if reason:
+                # 起動し直しに失敗しても、終了済みのブラウザを finally で再度終了しない
+                old_driver, driver = driver, None
+                driver = restart_browsers(old_driver, reason)
+            resume = False
+            delay = next_poll_delay(target["interval_minutes"], jitter)
+            due[i] = time.monotonic() + delay
+            if METRICS_PATH:
+                run_metrics.write(METRICS_PATH)
+            log.info("⏰ %s の次回巡回: %.0f秒後", target_label(target), delay)
+    finally:
+        log.info("🛑 常駐モード終了")
+        if driver is not None:
+            stop_browsers(driver)
+
+
+# 分散実行用のワークキュー（--enqueue で対象を投入し、--work で各段階を消費する）
+WORK_QUEUE_PATH = "work_queue.sqlite3"
+WORK_LEASE_SECONDS = 600
+WORK_MAX_ATTEMPTS = 5
+WORK_POLL_SECONDS = 5
+WORK_KINDS = ("upload", "tweet_url", "target")  # 下流の段階から優先して取り出す
+
+
+class SqliteWorkQueue:
+    """
+    SQLiteファイルによるワークキュー。
+    lease() で取り出した項目は期限（lease_seconds）内に ack() / release() / fail() する。
+    処理が長引く場合は renew() で期限を延ばす。
+    期限切れの項目は次の lease() 時に pending に戻り、別のワーカー・別のノードが取り出す。
+    同じ kind で key が同じ項目は1件しか登録されない（処理済みの項目も含む）。
+    ただし dead になった項目は、同じ key で put() し直すと削除して登録し直す。
+    """
+
+    def __init__(self, path=WORK_QUEUE_PATH, max_attempts=WORK_MAX_ATTEMPTS):
+        self.path = path
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        # 他プロセスの書き込み中はロック解放を待つ。WALで読み取りは書き込みを待たない
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS items ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, kind TEXT NOT NULL, key TEXT, "
+                "grp TEXT, payload TEXT NOT NULL, state TEXT NOT NULL DEFAULT 'pending', "
+                "attempts INTEGER NOT NULL DEFAULT 0, available_at REAL NOT NULL, "
+                "lease_until REAL, token TEXT, owner TEXT, error TEXT, "
+                "UNIQUE (kind, key))"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS items_ready "
+                "ON items (kind, state, available_at)"
+            )
+
+    def put(self, kind, payload, key=None, group=None, delay=0):
+        """登録できたら True（同じ key の項目が dead 以外で既にあれば False）"""
+        with self._lock, self._conn:
+            if key is not None:
+                # 再試行を使い切った項目は、投入し直されたら最初からやり直す
+                self._conn.execute(
+                    "DELETE FROM items WHERE kind = ? AND key = ? AND state = 'dead'",
+                    (kind, key),
+                )
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO items (kind, key, grp, payload, available_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    kind,
+                    key,
+                    group,
+                    json.dumps(payload, ensure_ascii=False),
+                    time.time() + delay,
+                ),
+            )
+        return cursor.rowcount == 1
+
+    def lease(self, kinds, owner, lease_seconds=WORK_LEASE_SECONDS):
+        """kinds の順に取り出せる項目を探し、lease した項目（dict）を返す。なければ None"""
+        now = time.time()
+        token = uuid.uuid4().hex
+        with self._lock, self._conn:
+            self._requeue_expired(now)
+            for kind in kinds:
+                # 1文の UPDATE で選択と確保を行い、複数プロセスが同じ項目を取らないようにする
+                rows = self._conn.execute(
+                    "UPDATE items SET state = 'leased', attempts = attempts + 1, "
+                    "lease_until = ?, token = ?, owner = ? "
+                    "WHERE id = (SELECT id FROM items WHERE kind = ? AND state = 'pending' "
+                    "AND available_at <= ? ORDER BY available_at, id LIMIT 1) "
+                    "RETURNING id, kind, grp, payload, attempts",
+                    (now + lease_seconds, token, owner, kind, now),
+                ).fetchall()
+                if rows:
+                    item_id, kind, group, payload, attempts = rows[0]
+                    return {
+                        "id": item_id,
+                        "kind": kind,
+                        "group": group,
+                        "payload": json.loads(payload),
+                        "attempts": attempts,
+                        "token": token,
+                    }
+        return None
+
+    def _requeue_expired(self, now):
+        self._conn.execute(
+            "UPDATE items SET state = CASE WHEN attempts >= ? THEN 'dead' "
+            "ELSE 'pending' END, token = NULL, lease_until = NULL, "
+            "error = 'lease expired' WHERE state = 'leased' AND lease_until < ?",
+            (self.max_attempts, now),
+        )
+
+    def _settle(self, item, sql, params=()):
+        """lease が有効なままなら sql を実行する。期限切れで他に渡っていれば False"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                f"{sql} WHERE id = ? AND token = ?",
+                (*params, item["id"], item["token"]),
+            )
+        if cursor.rowcount != 1:
+            log.warning("⚠️ lease切れの項目: %s #%s", item["kind"], item["id"])
+        return cursor.rowcount == 1
+
+    def renew(self, item, lease_seconds=WORK_LEASE_SECONDS):
+        """lease の期限を今から lease_seconds 秒後まで延ばす"""
+        return self._settle(
+            item, "UPDATE items SET lease_until = ?", (time.time() + lease_seconds,)
+        )
+
+    def ack(self, item):
+        return self._settle(
+            item, "UPDATE items SET state = 'done', token = NULL, lease_until = NULL"
+        )
+
+    def release(self, item, delay=0, error=None):
+        """delay 秒後に再度取り出せるよう戻す（試行回数が上限なら dead）"""
+        return self._settle(
+            item,
+            "UPDATE items SET state = CASE WHEN attempts >= ? THEN 'dead' "
+            "ELSE 'pending' END, available_at = ?, error = ?, "
+            "token = NULL, lease_until = NULL",
+            (self.max_attempts, time.time() + delay, error),
+        )
+
+    def fail(self, item, error=None):
+        """再試行しても無駄な項目を dead にする"""
+        return self._settle(
+            item,
+            "UPDATE items SET state = 'dead', error = ?, token = NULL, lease_until = NULL",
+            (error,),
+        )
+
+    def discard(self, item):
+        """項目を削除し、同じ key を後で登録し直せるようにする"""
+        return self._settle(item, "DELETE FROM items")
+
+    def count(self, kind, group):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM items WHERE kind = ? AND grp = ? AND state != 'dead'",
+                (kind, group),
+            ).fetchone()[0]
+
+    def has_work(self, kinds):
+        """kinds の pending（待機中を含む）または leased の項目が残っているか"""
+        with self._lock:
+            return (
+                self._conn.execute(
+                    "SELECT 1 FROM items WHERE state IN ('pending', 'leased') "
+                    f"AND kind IN ({','.join('?' * len(kinds))}) LIMIT 1",
+                    tuple(kinds),
+                ).fetchone()
+                is not None
+            )
+
+    def stats(self):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT kind, state, COUNT(*) FROM items GROUP BY kind, state"
+            ).fetchall()
+        stats = {}
+        for kind, state, count in rows:
+            stats.setdefault(kind, {})[state] = count
+        return stats
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def open_work_queue(spec=WORK_QUEUE_PATH, **kwargs):
+    """
+    spec: SQLiteファイルのパス、または "sqlite:///パス"。
+    別のバックエンドを足す場合はここでスキームごとに振り分ける
+    """
+    if "://" in spec:
+        scheme, path = spec.split("://", 1)
+        if scheme != "sqlite":
+            raise ValueError(f"❌ 未対応のワークキュー: {spec}")
+        spec = path
+    return SqliteWorkQueue(spec, **kwargs)
+
+
+def enqueue_targets(config, work_queue):
+    """targets（未指定なら extract_target / mode の1件）を target 項目として投入する"""
+    targets = [
+        {"extract_target": t} if isinstance(t, str) else t
+        for t in config.get("targets") or [{}]
+    ]
+    # 設定の誤りは消費側ではなく投入時に検出する
+    expand_targets(config, targets)
+    for target in targets:
+        work_queue.put("target", target)
+    log.info("📥 %s 件の対象をワークキューに投入: %s", len(targets), work_queue.path)
+
+
+def use_process_user_data_dir():
+    """
+    同じマシンで複数の --work プロセスを起動しても lean のChromeプロファイルがロックで
+    衝突しないよう、このプロセス専用のユーザーデータディレクトリを使い、終了時に削除する
+    """
+    global USER_DATA_DIR
+    USER_DATA_DIR = f"{USER_DATA_DIR}_work{os.getpid()}"
+    atexit.register(remove_user_data_dirs, USER_DATA_DIR)
+
+
+def remove_user_data_dirs(base):
+    for path in glob.glob(glob.escape(base)) + glob.glob(f"{glob.escape(base)}_*"):
+        shutil.rmtree(path, ignore_errors=True)
+
+
+class QueueWorker:
+    """
+    ワークキューの各段階を消費する。
+      target    : target_only（DOM方式）はタイムラインを走査して投稿URLを tweet_url として投入。
+                  それ以外はその場で収集・リプライ統合・OCRまで行い upload として投入
+      tweet_url : 詳細ページの抽出・リプライ統合・OCRを行い upload として投入
+      upload    : Notionに登録（429/5xx は Retry-After 後に取り出せるようキューに戻す）
+    ブラウザは target / tweet_url を初めて取り出したときに起動する。
+    """
+
+    def __init__(
+        self,
+        config,
+        work_queue,
+        kinds=WORK_KINDS,
+        lease_seconds=WORK_LEASE_SECONDS,
+        poll_seconds=WORK_POLL_SECONDS,
+    ):
+        self.config = config
+        self.work_queue = work_queue
+        self.kinds = [kind for kind in WORK_KINDS if kind in kinds]
+        self.lease_seconds = lease_seconds
+        self.poll_seconds = poll_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self.bucket = TokenBucket(
+            float(config.get("notion_rate_limit", NOTION_RATE_LIMIT))
+        )
+        self.driver = None
+        self.ocr_stage = None
+        self.handlers = {
+            "target": self.handle_target,
+            "tweet_url": self.handle_tweet_url,
+            "upload": self.handle_upload,
+        }
+
+    def browser(self):
+        if self.driver is None:
+            self.driver = start_browsers()
+        return self.driver
+
+    def target_config(self, target):
+        config = expand_targets(self.config, [target])[0]
+        select_target(config)
+        return config
+
+    def enqueue_uploads(self, tweets, group):
+        """リプライ統合とOCRを済ませた投稿を upload 項目として投入する"""
+        if self.ocr_stage is None:
+            self.ocr_stage = OcrStage(int(self.config.get("ocr_workers", OCR_WORKERS)))
+        self.ocr_stage.submit_batch(tweets)
+        for tweet in tweets:
+            tweet = merge_replies_with_driver(self.driver, tweet)
+            tweet["ocr_texts"] = self.ocr_stage.collect(tweet)
+            job = build_notion_job(tweet)
+            if job is not None:
+                self.work_queue.put("upload", job, key=job["id"], group=group)
+
+    def handle_target(self, item):
+        target = self.target_config(item["payload"])
+        group = f"{target_label(target)}#{item['id']}"
+        driver = self.browser()
+        if target["mode"] != "target_only" or CAPTURE_BACKEND == "graphql":
+            # 対象間の重複は upload 項目の key（投稿ID）で1件にまとまるため、
+            # 常駐するワーカーでは増え続ける claimed_tweet_ids を使わない
+            self.enqueue_uploads(collect_tweets(driver, target), group)
+            return
+        urls = discover_tweet_urls(
+            driver, target["extract_target"], target["max_tweets"] * URL_BUFFER_FACTOR
+        )
+        urls = [
+            url
+            for url in urls
+            if not already_registered(re.sub(r"\D", "", url.split("/")[-1]))
+        ]
+        # max_tweets を超えるURLは handle_tweet_url で上限により捨てられるため mark は据え置き
+        account = target["extract_target"]
+        if not scan_reached_mark(account, capped=len(urls) > target["max_tweets"]):
+            account = None
+        added = 0
+        for url in urls:
+            added += self.work_queue.put(
+                "tweet_url",
+                {"url": url, "target": item["payload"], "timeline_account": account},
+                key=url,
+                group=group,
+            )
+        log.info("📥 %s: %s 件のURLを投入", target_label(target), added)
+
+    def handle_tweet_url(self, item):
+        target = self.target_config(item["payload"]["target"])
+        url = item["payload"]["url"]
+        # 同じ対象の登録件数が max_tweets に達していれば、次回また拾えるよう削除する
+        if self.work_queue.count("upload", item["group"]) >= target["max_tweets"]:
+            log.info(
+                "🎯 %s は登録件数の上限に達したためスキップ: %s", item["group"], url
+            )
+            self.work_queue.discard(item)
+            return False
+        # 読み込めなかったページは例外にして process() で時間をおいて再試行する
+        # （extract_and_merge_tweets は失敗を握りつぶすため使わない）
+        thread = extract_thread_from_detail_page(self.browser(), url)
+        if thread is None:
+            raise RuntimeError(f"詳細ページを読み込めません: {url}")
+        tweets = []
+        for post in thread[:1]:
+            if not post.get("id"):
+                log.warning("⚠️ 無効ID → スキップ: %s", url)
+            elif already_registered(post["id"]):
+                log.info("🚫 登録済み → スキップ: %s", post["id"])
+            else:
+                tweets.append(post)
+        account = item["payload"].get("timeline_account")
+        if account:
+            for tweet in tweets:
+                tweet["timeline_account"] = account
+        self.enqueue_uploads(tweets, item["group"])
+
+    def handle_upload(self, item):
+        job = item["payload"]
+        if already_registered(job["id"]):
+            log.info("🚫 スキップ済: %s", job["id"])
+            return
+        self.bucket.acquire()
+        create_notion_page(job)
+
+    def retry_delay(self, item, error):
+        """再試行までの秒数。再試行しても無駄なら None"""
+        if item["kind"] == "upload":
+            wait = get_retry_after(error, item["attempts"])
+            if wait is not None and getattr(error, "status", None) == 429:
+                self.bucket.pause(wait)
+            return wait
+        return min(2 ** item["attempts"] * 5, 300)
+
+    def keep_leased(self, item, done):
+        """done が立つまで lease_seconds の1/3ごとに lease を延長する"""
+        while not done.wait(self.lease_seconds / 3):
+            if not self.work_queue.renew(item, self.lease_seconds):
+                return
+
+    def process(self, item):
+        # 処理中に期限が切れて別のワーカーに渡らないよう、別スレッドで lease を延長し続ける
+        done = threading.Event()
+        heartbeat = threading.Thread(
+            target=self.keep_leased, args=(item, done), daemon=True
+        )
+        heartbeat.start()
+        try:
+            settled = self.handlers[item["kind"]](item) is False
+        except Exception as e:
+            done.set()
+            heartbeat.join()
+            run_metrics.inc("work_item_errors", kind=item["kind"])
+            wait = self.retry_delay(item, e)
+            if wait is None:
+                log.warning("❌ %s #%s（再試行不可）: %s", item["kind"], item["id"], e)
+                self.work_queue.fail(item, str(e))
+            else:
+                log.warning(
+                    "⏳ %s #%s を %.0f秒後に再試行 (%s/%s): %s",
+                    item["kind"],
+                    item["id"],
+                    wait,
+                    item["attempts"],
+                    self.work_queue.max_attempts,
+                    e,
+                )
+                self.work_queue.release(item, delay=wait, error=str(e))
+            if item["kind"] != "upload" and self.driver is not None:
+                # ブラウザ側の異常かもしれないため、次の項目では起動し直す
+                run_metrics.inc("browser_recycles", reason="error")
+                try:
+                    stop_browsers(self.driver)
+                except Exception as e:
+                    log.warning("⚠️ ブラウザ終了失敗: %s", e)
+                self.driver = None
+            return
+        done.set()
+        heartbeat.join()
+        if not settled:
+            self.work_queue.ack(item)
+        run_metrics.inc("work_items", kind=item["kind"])
+
+    def run(self, follow=False):
+        """
+        キューが空になるまで（follow なら停止シグナルまで）取り出して処理する。
+        他のノードが lease 中の項目が残っている間は、期限切れで戻ってくる可能性があるため待つ
+        """
+        log.info(
+            "🏭 ワークキュー消費開始: %s (%s) %s",
+            ",".join(self.kinds),
+            self.owner,
+            self.work_queue.path,
+        )
+        try:
+            while not stop_requested.is_set():
+                item = self.work_queue.lease(self.kinds, self.owner, self.lease_seconds)
+                if item is None:
+                    if not follow and not self.work_queue.has_work(self.kinds):
+                        break
+                    stop_requested.wait(self.poll_seconds)
+                    continue
+                self.process(item)
+        finally:
+            if self.ocr_stage is not None:
+                self.ocr_stage.shutdown()
+            if self.driver is not None:
+                stop_browsers(self.driver)
+            log.info("🏭 ワークキューの状況: %s", self.work_queue.stats())
+
+
+def finish_run():
+    close_stores()
+    shutdown_detail_parse_pool()
+    if METRICS_PATH:
+        run_metrics.write(METRICS_PATH)
+    log.info("✅ 全投稿の処理完了")
+    shutdown_logging()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--config", default="config.json", help="設定ファイル（JSON）")
+    parser.add_argument(
+        "--account", default="accounts.json", help="アカウントファイル（JSON）"
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="前回中断した実行をジャーナルから再開する",
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="ブラウザを起動したまま daemon_targets を定期巡回する",
+    )
+    parser.add_argument(
+        "--enqueue",
+        action="store_true",
+        help="targets をワークキューに投入する（--work がなければ投入のみで終了）",
+    )
+    parser.add_argument(
+        "--work",
+        help="ワークキューから取り出して処理する段階（target,tweet_url,upload のカンマ区切り、all で全段階）",
+    )
+    parser.add_argument(
+        "--follow",
+        action="store_true",
+        help="--work でキューが空になっても終了せず、新しい項目を待ち続ける",
+    )
+    args = parser.parse_args()
+    work_kinds = None
+    if args.work:
+        work_kinds = WORK_KINDS if args.work == "all" else args.work.split(",")
+        unknown = set(work_kinds) - set(WORK_KINDS)
+        if unknown:
+            parser.error(f"未知の段階: {','.join(sorted(unknown))}")
+
+    config = load_config(args.config)
+    account = load_config(args.account)
+    setup_logging(
+        config.get("log_level", LOG_LEVEL),
+        config.get("log_format", LOG_FORMAT),
+        config.get("log_path", LOG_PATH),
+    )
+
+    if args.enqueue or work_kinds:
+        work_queue = open_work_queue(
+            config.get("work_queue", WORK_QUEUE_PATH),
+            max_attempts=int(config.get("work_max_attempts", WORK_MAX_ATTEMPTS)),
+        )
+        if args.enqueue:
+            enqueue_targets(config, work_queue)
+        if not work_kinds:
+            work_queue.close()
+            shutdown_logging()
+            return
+
+    apply_config(config, account)
+    open_stores(config, resume=args.resume, use_journal=not work_kinds)
+
+    if work_kinds:
+        handle_stop_signals()
+        use_process_user_data_dir()
+        QueueWorker(
+            config,
+            work_queue,
+            work_kinds,
+            lease_seconds=float(config.get("work_lease_seconds", WORK_LEASE_SECONDS)),
+            poll_seconds=float(config.get("work_poll_seconds", WORK_POLL_SECONDS)),
+        ).run(follow=args.follow)
+        work_queue.close()
+        finish_run()
+        return
+
+    uploader = NotionUploader(
+        workers=int(config.get("notion_upload_workers", NOTION_UPLOAD_WORKERS)),
+        rate=float(config.get("notion_rate_limit", NOTION_RATE_LIMIT)),
+        max_attempts=int(config.get("notion_max_attempts", NOTION_MAX_ATTEMPTS)),
+        retry_queue_path=config.get("notion_retry_queue_path", NOTION_RETRY_QUEUE_PATH),
+    )
+    uploader.drain_retry_queue()
+    ocr_stage = OcrStage(int(config.get("ocr_workers", OCR_WORKERS)))
+
+    if args.daemon:
+        run_daemon(config, ocr_stage, uploader, resume=args.resume)
+    else:
+        run_batch(config, ocr_stage, uploader, resume=args.resume)
+
+    ocr_stage.shutdown()
+    uploader.close()
+    finish_run()
 
 
 if __name__ == "__main__":